@@ -0,0 +1,53 @@
+# backend/app/api/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_admin
+from app.core.profiler import profile_store
+from app.core.slow_queries import slow_query_log
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """Последние профили запросов (X-Profile: 1 вместе с X-Admin-Key)"""
+    return {"profiles": profile_store.list()}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: int):
+    """Сводка профиля: SQL по шаблонам и функции с наибольшим собственным временем"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.details()
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(profile_id: int):
+    """Folded stacks для flamegraph.pl / speedscope / inferno"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded())
+
+@router.get("/slow-queries")
+async def list_slow_queries(limit: int = Query(100, ge=1, le=1000)):
+    """Последние медленные запросы, новые первыми"""
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "total": slow_query_log.total,
+        "queries": slow_query_log.list(limit),
+    }
+
+@router.get("/slow-queries/summary")
+async def slow_queries_summary(limit: int = Query(50, ge=1, le=500)):
+    """Медленные запросы по шаблонам: суммарное время, маршруты и последний план"""
+    return {"statements": slow_query_log.summary(limit)}
+
+@router.get("/slow-queries/{entry_id}")
+async def get_slow_query(entry_id: int):
+    entry = slow_query_log.get(entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Slow query not found")
+    return entry
@@ -1,13 +1,15 @@
 # backend/app/api/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.database import get_db
+from sqlalchemy import select, update, func, or_, exists, literal, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.database import get_db, read_your_writes
 from app.models import User, UserSettings
 from app.core.security import create_access_token
 from datetime import timedelta
 from app.config import settings
 from pydantic import BaseModel, Field
+import hmac
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,14 +18,96 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 class TokenRequest(BaseModel):
     max_id: str = Field(..., min_length=1, max_length=100, description="User MAX ID")
-    full_name: str = Field(..., min_length=1, max_length=200, description="User full name")
-    username: str = Field("", max_length=100, description="Username (optional)")
+    # Не переданные поля профиля не перезаписываются (бот не всегда знает имя пользователя)
+    full_name: str | None = Field(None, min_length=1, max_length=200, description="User full name (optional)")
+    username: str | None = Field(None, max_length=100, description="Username (optional)")
 
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
     user: dict
 
+class ServiceTokenRequest(BaseModel):
+    max_id: str = Field(..., min_length=1, max_length=100, description="User MAX ID")
+    full_name: str | None = Field(None, min_length=1, max_length=200, description="User full name (optional)")
+    username: str | None = Field(None, max_length=100, description="Username (optional)")
+
+# Значения по умолчанию UserSettings заданы на стороне Python и не попадают
+# в INSERT ... SELECT автоматически, поэтому подставляем их явно
+_SETTINGS_DEFAULTS = [
+    column for column in UserSettings.__table__.columns
+    if column.default is not None and column.default.is_scalar
+]
+
+def _build_user_upsert(request: TokenRequest):
+    """Один запрос: upsert пользователя + настройки по умолчанию для нового"""
+    user_insert = pg_insert(User).values(
+        max_id=request.max_id,
+        full_name=request.full_name or request.max_id,
+        username=request.username or "",
+        is_active=True
+    )
+    profile = [
+        column for column, value in ((User.full_name, request.full_name), (User.username, request.username))
+        if value is not None
+    ]
+    if profile:
+        # UPDATE выполняется только если переданные поля профиля действительно изменились
+        upserted = user_insert.on_conflict_do_update(
+            index_elements=[User.max_id],
+            set_={
+                **{column.key: user_insert.excluded[column.key] for column in profile},
+                "updated_at": func.now()
+            },
+            where=or_(*[column.is_distinct_from(user_insert.excluded[column.key]) for column in profile])
+        )
+    else:
+        upserted = user_insert.on_conflict_do_nothing(index_elements=[User.max_id])
+    upserted = upserted.returning(
+        User.id, User.max_id, User.full_name, User.username, User.is_active,
+        literal_column("xmax = 0").label("inserted")
+    ).cte("upserted_user")
+
+    # Настройки создаются только для только что вставленного пользователя
+    created_settings = pg_insert(UserSettings).from_select(
+        ["user_id"] + [column.name for column in _SETTINGS_DEFAULTS],
+        select(
+            upserted.c.id,
+            *[literal(column.default.arg, column.type) for column in _SETTINGS_DEFAULTS]
+        ).where(upserted.c.inserted)
+    ).on_conflict_do_nothing(index_elements=[UserSettings.user_id]).cte("created_settings")
+
+    # Если данные не изменились, RETURNING пуст - читаем существующую строку
+    unchanged_user = select(
+        User.id, User.max_id, User.full_name, User.username, User.is_active
+    ).where(
+        User.max_id == request.max_id,
+        ~exists(select(upserted.c.id))
+    )
+
+    return select(
+        upserted.c.id, upserted.c.max_id, upserted.c.full_name,
+        upserted.c.username, upserted.c.is_active
+    ).union_all(unchanged_user).add_cte(created_settings)
+
+def _issue_token(user) -> TokenResponse:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.max_id},
+        expires_delta=access_token_expires
+    )
+
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user={
+            "id": user.id,
+            "max_id": user.max_id,
+            "full_name": user.full_name,
+            "username": user.username
+        }
+    )
+
 @router.post("/token", response_model=TokenResponse)
 async def login_or_create_user(
     request: TokenRequest,
@@ -33,58 +117,22 @@ async def login_or_create_user(
     logger.info(f"Received token request for user_id: {request.max_id}")
 
     try:
-        # Поиск существующего пользователя
-        result = await db.execute(select(User).where(User.max_id == request.max_id))
-        user = result.scalar_one_or_none()
-
-        if not user:
-            logger.info(f"Creating new user with max_id: {request.max_id}")
-            user = User(
-                max_id=request.max_id,
-                full_name=request.full_name,
-                username=request.username or ""
+        result = await db.execute(_build_user_upsert(request))
+        user = result.one_or_none()
+        if user is None:
+            # Параллельный первый вход: строку вставил другой запрос, и при старте
+            # нашего снимка она еще не была видна. Сейчас она уже закоммичена
+            result = await db.execute(
+                select(User.id, User.max_id, User.full_name, User.username, User.is_active)
+                .where(User.max_id == request.max_id)
             )
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
-
-            # Создаем настройки по умолчанию для нового пользователя
-            user_settings = UserSettings(user_id=user.id)
-            db.add(user_settings)
-            await db.commit()
-
-            logger.info(f"User created successfully with ID: {user.id}")
-        else:
-            logger.info(f"User found with ID: {user.id}")
-
-        # Обновляем данные пользователя, если они изменились
-        if (user.full_name != request.full_name or
-            user.username != (request.username or "")):
-            user.full_name = request.full_name
-            user.username = request.username or ""
-            await db.commit()
-            await db.refresh(user)
-            logger.info(f"User data updated for: {request.max_id}")
-
-        # Создание токена
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.max_id},
-            expires_delta=access_token_expires
-        )
+            user = result.one()
+        await db.commit()
+        # Следующие чтения нового пользователя идут в основную БД, пока реплики не получат запись
+        read_your_writes.mark(user.max_id)
 
-        logger.info(f"Token generated for user_id: {request.max_id}")
-
-        return TokenResponse(
-            access_token=access_token,
-            token_type="bearer",
-            user={
-                "id": user.id,
-                "max_id": user.max_id,
-                "full_name": user.full_name,
-                "username": user.username
-            }
-        )
+        logger.info(f"Token generated for user_id: {request.max_id} (ID: {user.id})")
+        return _issue_token(user)
 
     except Exception as e:
         logger.error(f"Error during authentication for {request.max_id}: {str(e)}")
@@ -94,6 +142,51 @@ async def login_or_create_user(
             detail="Authentication failed"
         )
 
+@router.post("/service-token", response_model=TokenResponse)
+async def issue_service_token(
+    request: ServiceTokenRequest,
+    x_service_key: str = Header(None, description="Service API key"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Выдача токена для внутренних сервисов (бот); пишет в БД только при смене профиля"""
+    if not settings.SERVICE_API_KEY or not x_service_key or not hmac.compare_digest(
+        x_service_key, settings.SERVICE_API_KEY
+    ):
+        logger.warning(f"Invalid service key for service token request: {request.max_id}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid service key")
+
+    result = await db.execute(
+        select(User.id, User.max_id, User.full_name, User.username, User.is_active)
+        .where(User.max_id == request.max_id)
+    )
+    user = result.one_or_none()
+
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="User account is disabled")
+
+    profile = {
+        field: value for field, value in (
+            ("full_name", request.full_name), ("username", request.username)
+        )
+        if value is not None and value != getattr(user, field)
+    }
+    if profile:
+        result = await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(**profile, updated_at=func.now())
+            .returning(User.id, User.max_id, User.full_name, User.username, User.is_active)
+        )
+        user = result.one()
+        await db.commit()
+        read_your_writes.mark(user.max_id)
+
+    logger.info(f"Service token generated for user_id: {request.max_id}")
+    return _issue_token(user)
+
 async def get_current_user_for_auth(
     authorization: str = None,
     db: AsyncSession = Depends(get_db)
@@ -0,0 +1,124 @@
+# backend/app/api/batch.py
+import asyncio
+import json
+import logging
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from app.api.deps import get_current_user
+from app.database import read_only
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["batch"])
+
+MAX_BATCH_SIZE = 20
+# Сколько подзапросов выполняется одновременно: каждый держит свое соединение из пула
+MAX_CONCURRENCY = 5
+
+# Заголовки тела запроса batch не относятся к подзапросам
+_SKIPPED_HEADERS = {b"content-length", b"content-type"}
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = Field(None, description="Идентификатор для сопоставления ответа")
+    method: str = Field("GET", description="Поддерживается только GET")
+    path: str = Field(..., description="Путь относительно /api, например /dashboard/ или /tasks/?status=todo")
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+def _sub_scope(request: Request, path: str, user: User) -> dict:
+    parts = urlsplit(path)
+    full_path = parts.path if parts.path.startswith("/api/") else "/api" + parts.path
+    scope = {
+        key: value for key, value in request.scope.items()
+        if key not in ("path", "raw_path", "query_string", "method", "headers", "route",
+                       "endpoint", "path_params", "root_path")
+    }
+    scope.update({
+        "method": "GET",
+        "path": full_path,
+        "raw_path": full_path.encode(),
+        "root_path": "",
+        "query_string": parts.query.encode(),
+        "headers": [(k, v) for k, v in request.scope["headers"] if k not in _SKIPPED_HEADERS],
+        # Пользователь уже аутентифицирован запросом batch
+        "batch_user": user,
+    })
+    return scope
+
+
+async def _run_item(request: Request, item: BatchItem, user: User, limiter: asyncio.Semaphore) -> dict:
+    result = {"id": item.id, "path": item.path}
+    if item.method.upper() != "GET":
+        return {**result, "status": 405, "body": {"detail": "Only GET sub-requests are supported"}}
+    if not item.path.startswith("/") or urlsplit(item.path).path.rstrip("/").endswith("/batch"):
+        return {**result, "status": 400, "body": {"detail": "Invalid sub-request path"}}
+
+    status_code = 500
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    async with limiter:
+        try:
+            # Маршрутизатор без middleware: SQL подзапросов попадает в статистику самого batch
+            await request.app.router(_sub_scope(request, item.path, user), receive, send)
+        except StarletteHTTPException as e:
+            # Маршрут не найден: без ExceptionMiddleware маршрутизатор выбрасывает исключение
+            return {**result, "status": e.status_code, "body": {"detail": e.detail}}
+        except RequestValidationError as e:
+            # Ошибки параметров подзапроса - 422, как и у обычного запроса
+            return {**result, "status": 422, "body": {"detail": jsonable_encoder(e.errors())}}
+        except Exception:
+            logger.exception(f"Batch sub-request {item.path} failed")
+            return {**result, "status": 500, "body": {"detail": "Internal server error"}}
+
+    body = b"".join(chunks)
+    try:
+        parsed = json.loads(body) if body else None
+    except ValueError:
+        parsed = body.decode(errors="replace")
+    return {**result, "status": status_code, "body": parsed}
+
+
+@router.post("/batch")
+# POST только ради тела: batch ничего не пишет и не должен уводить чтения пользователя с реплик
+@read_only
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Несколько GET-запросов за один round trip.
+
+    Подзапросы выполняются параллельно, каждый в своей сессии БД.
+    Ошибка одного подзапроса не влияет на остальные: статус и тело
+    возвращаются для каждого элемента отдельно, в порядке запроса.
+    """
+    limiter = asyncio.Semaphore(MAX_CONCURRENCY)
+    responses = await asyncio.gather(*(
+        _run_item(request, item, current_user, limiter) for item in batch_request.requests
+    ))
+    failed = sum(1 for response in responses if response["status"] >= 400)
+    if failed:
+        logger.info(f"Batch for {current_user.max_id}: {failed} of {len(responses)} sub-requests failed")
+    return {"responses": responses}
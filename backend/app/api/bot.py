@@ -0,0 +1,117 @@
+# backend/app/api/bot.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from app.database import get_db, read_only
+from app.models import User, Project, ProjectMember, Task, JoinRequest, Notification
+from app.api.deps import get_current_user
+from app.models.enums import ProjectRole, TaskStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/bot", tags=["bot"])
+
+@router.get("/summary")
+@read_only
+async def get_bot_summary(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Компактная сводка для главных экранов бота: проекты со счетчиками, заявки и уведомления"""
+    try:
+        my_projects = select(ProjectMember.project_id).where(
+            ProjectMember.user_id == current_user.id
+        )
+
+        task_counts = (
+            select(
+                Task.project_id,
+                func.count(Task.id).label("total"),
+                func.count(Task.id).filter(Task.status == TaskStatus.DONE).label("done"),
+                func.count(Task.id).filter(Task.status == TaskStatus.IN_PROGRESS).label("in_progress"),
+                func.count(Task.id).filter(Task.status == TaskStatus.TODO).label("todo"),
+            )
+            .where(Task.project_id.in_(my_projects))
+            .group_by(Task.project_id)
+            .subquery()
+        )
+        member_counts = (
+            select(ProjectMember.project_id, func.count(ProjectMember.id).label("members"))
+            .where(ProjectMember.project_id.in_(my_projects))
+            .group_by(ProjectMember.project_id)
+            .subquery()
+        )
+
+        projects_stmt = (
+            select(
+                Project.title,
+                Project.hash,
+                Project.is_private,
+                ProjectMember.role,
+                func.coalesce(task_counts.c.total, 0).label("total"),
+                func.coalesce(task_counts.c.done, 0).label("done"),
+                func.coalesce(task_counts.c.in_progress, 0).label("in_progress"),
+                func.coalesce(task_counts.c.todo, 0).label("todo"),
+                func.coalesce(member_counts.c.members, 0).label("members"),
+            )
+            .join(ProjectMember, ProjectMember.project_id == Project.id)
+            .outerjoin(task_counts, task_counts.c.project_id == Project.id)
+            .outerjoin(member_counts, member_counts.c.project_id == Project.id)
+            .where(ProjectMember.user_id == current_user.id)
+            .order_by(Project.created_at.desc())
+        )
+        project_rows = (await db.execute(projects_stmt)).all()
+
+        managed_projects = select(ProjectMember.project_id).where(
+            ProjectMember.user_id == current_user.id,
+            ProjectMember.role.in_([ProjectRole.OWNER, ProjectRole.ADMIN])
+        )
+        counters = (await db.execute(
+            select(
+                select(func.count(JoinRequest.id))
+                .where(
+                    JoinRequest.status == "pending",
+                    JoinRequest.project_id.in_(managed_projects)
+                )
+                .scalar_subquery()
+                .label("pending_requests"),
+                select(func.count(Notification.id))
+                .where(
+                    Notification.user_id == current_user.id,
+                    Notification.is_read == False
+                )
+                .scalar_subquery()
+                .label("unread_notifications"),
+            )
+        )).one()
+
+        projects = [
+            {
+                "title": row.title,
+                "hash": row.hash,
+                "is_private": row.is_private,
+                "role": row.role,
+                "tasks": {
+                    "total": row.total,
+                    "done": row.done,
+                    "in_progress": row.in_progress,
+                    "todo": row.todo
+                },
+                "members_count": row.members
+            }
+            for row in project_rows
+        ]
+
+        return {
+            "projects": projects,
+            "pending_requests": counters.pending_requests or 0,
+            "unread_notifications": counters.unread_notifications or 0
+        }
+
+    except Exception as e:
+        logger.error(f"Error building bot summary for user {current_user.max_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
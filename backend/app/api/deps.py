@@ -1,19 +1,30 @@
 # backend/app/api/deps.py
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, status, Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
-from app.models import User
-from app.core.security import verify_token
-from sqlalchemy import select
+from app.database import get_db, engine, replica_engines
+from app.models import User, Project, Task, Comment
+from app.core.invalidation import invalidation_bus
+from app.core.project_cache import ProjectRef, project_cache
+from app.core.security import verify_token, verify_admin_key
+from sqlalchemy import select, func, true
+from typing import Dict, List
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 async def get_current_user(
+    request: Request,
     authorization: str = Header(None, description="Bearer token"),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """Получить текущего аутентифицированного пользователя"""
+    # Подзапросы /api/batch выполняются от имени уже аутентифицированного пользователя
+    batch_user = request.scope.get("batch_user")
+    if batch_user is not None:
+        return batch_user
+
     if not authorization or not authorization.startswith("Bearer "):
         logger.warning("Missing or invalid authorization header")
         raise HTTPException(
@@ -49,12 +60,59 @@ async def get_current_user(
     logger.info(f"Authenticated user: {user.max_id} (ID: {user.id})")
     return user
 
+async def require_admin(
+    x_admin_key: str = Header(None, description="Admin API key")
+) -> None:
+    """Доступ к административным эндпоинтам только с ключом ADMIN_API_KEY"""
+    if not verify_admin_key(x_admin_key):
+        logger.warning("Invalid or missing admin key")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+
+async def resolve_project(project_hash: str, db: AsyncSession) -> ProjectRef:
+    """id и флаги доступа проекта по хэшу; без запроса к БД, если проект уже в кэше"""
+    # Без слушателя инвалидации изменения из других воркеров не доходят - кэшу не доверяем
+    use_cache = invalidation_bus.connected
+    ref = project_cache.get(project_hash) if use_cache else None
+    if ref is not None:
+        return ref
+
+    generation = project_cache.generation
+    result = await db.execute(
+        select(Project.id, Project.is_private, Project.requires_approval, Project.created_by)
+        .where(Project.hash == project_hash)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    ref = ProjectRef(*row)
+    # Реплика может отставать от только что примененной инвалидации - кэшируем только с основной БД
+    if use_cache and (not replica_engines or db.bind is engine):
+        project_cache.put(project_hash, ref, generation)
+    return ref
+
+def encode_cursor(*values) -> str:
+    """Непрозрачный курсор keyset-пагинации из значений ключа сортировки"""
+    raw = json.dumps([value.isoformat() if hasattr(value, "isoformat") else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Значения курсора; 400, если курсор поврежден или выдан для другого ключа"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
 async def get_current_user_data(
+    request: Request,
     authorization: str = Header(None, description="Bearer token"),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
     """Получить сериализуемые данные текущего пользователя"""
-    user = await get_current_user(authorization, db)
+    user = await get_current_user(request, authorization, db)
 
     # Возвращаем только базовые данные для сериализации
     return {
@@ -67,11 +125,12 @@ async def get_current_user_data(
     }
 
 async def get_current_user_id(
+    request: Request,
     authorization: str = Header(None, description="Bearer token"),
     db: AsyncSession = Depends(get_db)
 ) -> int:
     """Получить только ID текущего пользователя (для оптимизации)"""
-    user = await get_current_user(authorization, db)
+    user = await get_current_user(request, authorization, db)
     return user.id
 
 async def require_project_access(
@@ -99,3 +158,91 @@ async def require_project_access(
         return False
 
     return True
+
+async def get_projects_task_stats(project_ids: List[int], db: AsyncSession) -> Dict[int, dict]:
+    """Количество задач по статусам для нескольких проектов одним запросом"""
+    from app.models import Task, TaskStatus
+
+    stats = {
+        project_id: {"total": 0, "done": 0, "in_progress": 0, "todo": 0}
+        for project_id in project_ids
+    }
+    if not project_ids:
+        return stats
+
+    result = await db.execute(
+        select(
+            Task.project_id,
+            func.count(Task.id),
+            func.count(Task.id).filter(Task.status == TaskStatus.DONE),
+            func.count(Task.id).filter(Task.status == TaskStatus.IN_PROGRESS),
+            func.count(Task.id).filter(Task.status == TaskStatus.TODO),
+        )
+        .where(Task.project_id.in_(project_ids))
+        .group_by(Task.project_id)
+    )
+    for project_id, total, done, in_progress, todo in result.all():
+        stats[project_id] = {"total": total, "done": done, "in_progress": in_progress, "todo": todo}
+    return stats
+
+async def get_projects_member_counts(project_ids: List[int], db: AsyncSession) -> Dict[int, int]:
+    """Количество участников для нескольких проектов одним запросом"""
+    from app.models import ProjectMember
+
+    counts = {project_id: 0 for project_id in project_ids}
+    if not project_ids:
+        return counts
+
+    result = await db.execute(
+        select(ProjectMember.project_id, func.count(ProjectMember.id))
+        .where(ProjectMember.project_id.in_(project_ids))
+        .group_by(ProjectMember.project_id)
+    )
+    counts.update(dict(result.all()))
+    return counts
+
+# Длина превью последнего комментария в списках задач
+COMMENT_SNIPPET_LENGTH = 140
+
+async def get_tasks_comment_previews(task_ids: List[int], db: AsyncSession) -> Dict[int, dict]:
+    """Число комментариев и последний комментарий для страницы задач одним запросом"""
+    previews = {task_id: {"comment_count": 0, "latest_comment": None} for task_id in task_ids}
+    if not task_ids:
+        return previews
+
+    comment_count = (
+        select(func.count())
+        .where(Comment.task_id == Task.id)
+        .scalar_subquery()
+    )
+    latest = (
+        select(
+            Comment.id.label("comment_id"),
+            func.left(Comment.content, COMMENT_SNIPPET_LENGTH).label("snippet"),
+            Comment.created_at,
+            Comment.user_id,
+            User.full_name,
+        )
+        .join(User, User.id == Comment.user_id)
+        .where(Comment.task_id == Task.id)
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+        .limit(1)
+        .lateral("latest_comment")
+    )
+    result = await db.execute(
+        select(Task.id, comment_count.label("comment_count"), latest)
+        .outerjoin(latest, true())
+        .where(Task.id.in_(task_ids))
+    )
+    for row in result.all():
+        previews[row.id] = {
+            "comment_count": row.comment_count,
+            "latest_comment": {
+                "id": row.comment_id,
+                "snippet": row.snippet,
+                "created_at": row.created_at,
+                "user_id": row.user_id,
+                "author_name": row.full_name,
+            } if row.snippet is not None else None,
+        }
+    return previews
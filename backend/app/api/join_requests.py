@@ -0,0 +1,98 @@
+# backend/app/api/join_requests.py
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from app.database import get_db, read_only
+from app.models import User, Project, ProjectMember, JoinRequest
+from app.api.deps import get_current_user
+from app.models.enums import ProjectRole
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/join-requests", tags=["join-requests"])
+
+@router.get("/pending")
+@read_only
+async def get_pending_join_requests(
+    cursor: Optional[int] = Query(None, description="ID последней полученной заявки"),
+    limit: int = Query(20, ge=1, le=100, description="Количество заявок на странице"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ожидающие заявки во всех проектах, где пользователь владелец или администратор"""
+    try:
+        managed_projects = select(ProjectMember.project_id).where(
+            ProjectMember.user_id == current_user.id,
+            ProjectMember.role.in_([ProjectRole.OWNER, ProjectRole.ADMIN])
+        )
+        pending_filter = (
+            JoinRequest.status == "pending",
+            JoinRequest.project_id.in_(managed_projects)
+        )
+
+        total_count = (
+            select(func.count(JoinRequest.id))
+            .where(*pending_filter)
+            .scalar_subquery()
+        )
+
+        stmt = (
+            select(JoinRequest, User, Project.title, Project.hash, total_count.label("total"))
+            .join(User, JoinRequest.user_id == User.id)
+            .join(Project, JoinRequest.project_id == Project.id)
+            .where(*pending_filter)
+        )
+        if cursor is not None:
+            stmt = stmt.where(JoinRequest.id > cursor)
+
+        # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+        stmt = stmt.order_by(JoinRequest.id).limit(limit + 1)
+
+        result = await db.execute(stmt)
+        rows = result.all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if rows:
+            total = rows[0].total
+        elif cursor is None:
+            total = 0
+        else:
+            # Курсор за концом списка - общее количество запрашиваем отдельно
+            total = await db.scalar(select(func.count(JoinRequest.id)).where(*pending_filter))
+
+        formatted_requests = []
+        for req, user, project_title, project_hash, _ in rows:
+            formatted_requests.append({
+                "id": req.id,
+                "project_id": req.project_id,
+                "user_id": req.user_id,
+                "status": req.status,
+                "requested_at": req.requested_at,
+                "processed_by_id": req.processed_by_id,
+                "processed_at": req.processed_at,
+                "project_title": project_title,
+                "project_hash": project_hash,
+                "user": {
+                    "id": user.id,
+                    "max_id": user.max_id,
+                    "full_name": user.full_name,
+                    "username": user.username
+                }
+            })
+
+        return {
+            "requests": formatted_requests,
+            "total": total or 0,
+            "next_cursor": formatted_requests[-1]["id"] if has_more else None
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching pending join requests for user {current_user.max_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
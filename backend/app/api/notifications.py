@@ -2,13 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
-from app.database import get_db
+from app.database import get_db, read_only
 from app.models import User, Notification
 from app.api.deps import get_current_user
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 @router.get("/")
+@read_only
 async def get_user_notifications(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -1,14 +1,19 @@
 #/backend/app/api/project.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, text
+from sqlalchemy import select, func, and_, or_, text, tuple_
 from sqlalchemy.orm import selectinload
-from app.database import get_db
+from app.database import get_db, read_only
 from app.models import User, Project, ProjectMember, JoinRequest, Task
-from app.api.deps import get_current_user
-from app.models.enums import ProjectRole
+from app.api.deps import (
+    get_current_user, get_projects_task_stats, get_projects_member_counts, resolve_project,
+    encode_cursor, decode_cursor
+)
+from app.core.invalidation import invalidation_bus
+from app.models.enums import ProjectRole, TaskStatus
 from pydantic import BaseModel
 from typing import Optional, List
+from datetime import datetime
 import secrets
 import string
 import logging
@@ -88,6 +93,7 @@ async def create_project(
         )
 
 @router.get("/")
+@read_only
 async def get_user_projects(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -101,45 +107,24 @@ async def get_user_projects(
         )
         memberships = result.scalars().all()
 
+        project_ids = [member.project_id for member in memberships]
+
+        # Статистика всех проектов двумя групповыми запросами
+        task_stats = await get_projects_task_stats(project_ids, db)
+        member_counts = await get_projects_member_counts(project_ids, db)
+
         projects_with_stats = []
 
         for member in memberships:
             project = member.member_project
-
-            # Подсчет статистики задач
-            total_result = await db.execute(
-                select(func.count(Task.id)).where(Task.project_id == project.id)
-            )
-            done_result = await db.execute(
-                select(func.count(Task.id)).where(
-                    Task.project_id == project.id,
-                    Task.status == 'done'
-                )
-            )
-            in_progress_result = await db.execute(
-                select(func.count(Task.id)).where(
-                    Task.project_id == project.id,
-                    Task.status == 'in_progress'
-                )
-            )
-            todo_result = await db.execute(
-                select(func.count(Task.id)).where(
-                    Task.project_id == project.id,
-                    Task.status == 'todo'
-                )
-            )
-
-            # Подсчет участников
-            members_count_result = await db.execute(
-                select(func.count(ProjectMember.id)).where(ProjectMember.project_id == project.id)
-            )
+            project_stats = task_stats[project.id]
 
             stats = {
-                "tasks_count": total_result.scalar() or 0,
-                "tasks_done": done_result.scalar() or 0,
-                "tasks_in_progress": in_progress_result.scalar() or 0,
-                "tasks_todo": todo_result.scalar() or 0,
-                "members_count": members_count_result.scalar() or 0
+                "tasks_count": project_stats["total"],
+                "tasks_done": project_stats["done"],
+                "tasks_in_progress": project_stats["in_progress"],
+                "tasks_todo": project_stats["todo"],
+                "members_count": member_counts[project.id]
             }
 
             project_data = {
@@ -167,6 +152,7 @@ async def get_user_projects(
         )
 
 @router.get("/{project_hash}")
+@read_only
 async def get_project(
     project_hash: str,
     current_user: User = Depends(get_current_user),
@@ -202,33 +188,12 @@ async def get_project(
     project_members = members_result.scalars().all()
 
     # Подсчет статистики
-    total_result = await db.execute(
-        select(func.count(Task.id)).where(Task.project_id == project.id)
-    )
-    done_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.project_id == project.id,
-            Task.status == 'done'
-        )
-    )
-    in_progress_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.project_id == project.id,
-            Task.status == 'in_progress'
-        )
-    )
-    todo_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.project_id == project.id,
-            Task.status == 'todo'
-        )
-    )
-
+    project_stats = (await get_projects_task_stats([project.id], db))[project.id]
     stats = {
-        "tasks_count": total_result.scalar() or 0,
-        "tasks_done": done_result.scalar() or 0,
-        "tasks_in_progress": in_progress_result.scalar() or 0,
-        "tasks_todo": todo_result.scalar() or 0
+        "tasks_count": project_stats["total"],
+        "tasks_done": project_stats["done"],
+        "tasks_in_progress": project_stats["in_progress"],
+        "tasks_todo": project_stats["todo"]
     }
 
     # Формируем ответ с упрощенными данными
@@ -310,6 +275,8 @@ async def update_project(
     for field, value in update_fields.items():
         setattr(project, field, value)
 
+    if "is_private" in update_fields or "requires_approval" in update_fields:
+        await invalidation_bus.publish(db, f"project_hash:{project.hash}")
     await db.commit()
     await db.refresh(project)
 
@@ -418,6 +385,7 @@ async def delete_project(
             text("DELETE FROM projects WHERE id = :project_id"),
             {"project_id": project.id}
         )
+        await invalidation_bus.publish(db, f"project_hash:{project_hash}")
 
         await db.commit()
 
@@ -440,10 +408,7 @@ async def debug_project_structure(
 ):
     """Диагностика структуры проекта"""
     try:
-        result = await db.execute(select(Project).where(Project.hash == project_hash))
-        project = result.scalar_one_or_none()
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = await resolve_project(project_hash, db)
 
         # Проверяем существование таблицы task_assignees
         table_check = await db.execute(
@@ -484,16 +449,14 @@ async def debug_project_structure(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{project_hash}/members")
+@read_only
 async def get_project_members(
     project_hash: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить участников проекта"""
-    result = await db.execute(select(Project).where(Project.hash == project_hash))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await resolve_project(project_hash, db)
 
     # Проверка доступа
     membership = await db.execute(
@@ -540,10 +503,7 @@ async def remove_project_member(
     db: AsyncSession = Depends(get_db)
 ):
     """Удалить участника из проекта"""
-    result = await db.execute(select(Project).where(Project.hash == project_hash))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await resolve_project(project_hash, db)
 
     # Проверка прав доступа
     membership = await db.execute(
@@ -599,10 +559,7 @@ async def update_member_role(
     db: AsyncSession = Depends(get_db)
 ):
     """Изменить роль участника"""
-    result = await db.execute(select(Project).where(Project.hash == project_hash))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await resolve_project(project_hash, db)
 
     # Проверка прав доступа - владелец или администратор
     membership = await db.execute(
@@ -663,10 +620,7 @@ async def join_project_request(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Project).where(Project.hash == project_hash))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await resolve_project(project_hash, db)
 
     # Проверка, является ли пользователь уже участником
     membership = await db.execute(
@@ -704,15 +658,13 @@ async def join_project_request(
         return {"status": "pending_approval", "message": "Join request sent for approval"}
 
 @router.get("/{project_hash}/join-requests")
+@read_only
 async def get_join_requests(
     project_hash: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Project).where(Project.hash == project_hash))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await resolve_project(project_hash, db)
 
     membership = await db.execute(
         select(ProjectMember).where(
@@ -753,16 +705,14 @@ async def get_join_requests(
     return {"requests": formatted_requests}
 
 @router.get("/{project_hash}/join-requests/all")
+@read_only
 async def get_all_join_requests(
     project_hash: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить все заявки на вступление (включая обработанные)"""
-    result = await db.execute(select(Project).where(Project.hash == project_hash))
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await resolve_project(project_hash, db)
 
     membership = await db.execute(
         select(ProjectMember).where(
@@ -810,10 +760,7 @@ async def delete_join_request(
 ):
     """Удалить заявку на вступление (только обработанные)"""
     try:
-        result = await db.execute(select(Project).where(Project.hash == project_hash))
-        project = result.scalar_one_or_none()
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = await resolve_project(project_hash, db)
 
         membership = await db.execute(
             select(ProjectMember).where(
@@ -859,6 +806,7 @@ async def delete_join_request(
         )
 
 @router.get("/search/public")
+@read_only
 async def search_public_projects(
     query: str = Query(None, description="Поисковый запрос"),
     current_user: User = Depends(get_current_user),
@@ -880,32 +828,23 @@ async def search_public_projects(
             )
 
         # Исключаем проекты, в которых пользователь уже состоит
-        user_project_ids = await db.execute(
-            select(ProjectMember.project_id).where(ProjectMember.user_id == current_user.id)
-        )
-        user_project_ids = [row[0] for row in user_project_ids.fetchall()]
-
-        if user_project_ids:
-            stmt = stmt.where(Project.id.notin_(user_project_ids))
+        user_project_ids = select(ProjectMember.project_id).where(ProjectMember.user_id == current_user.id)
+        stmt = stmt.where(Project.id.notin_(user_project_ids))
 
         # Сортировка по дате создания
-        stmt = stmt.order_by(Project.created_at.desc())
+        stmt = stmt.order_by(Project.created_at.desc()).options(selectinload(Project.project_owner))
 
         result = await db.execute(stmt)
         projects = result.scalars().all()
 
+        # Статистика задач всех найденных проектов одним запросом
+        task_stats = await get_projects_task_stats([project.id for project in projects], db)
+
         # Форматируем ответ
         projects_data = []
         for project in projects:
-            # Получаем владельца
-            owner_result = await db.execute(select(User).where(User.id == project.created_by))
-            owner = owner_result.scalar_one_or_none()
-
-            # Статистика задач
-            total_tasks = await db.execute(select(func.count(Task.id)).where(Task.project_id == project.id))
-            done_tasks = await db.execute(select(func.count(Task.id)).where(
-                Task.project_id == project.id, Task.status == 'done'
-            ))
+            owner = project.project_owner
+            project_stats = task_stats[project.id]
 
             projects_data.append({
                 "id": project.id,
@@ -922,8 +861,8 @@ async def search_public_projects(
                     "username": owner.username
                 } if owner else None,
                 "stats": {
-                    "tasks_count": total_tasks.scalar() or 0,
-                    "tasks_done": done_tasks.scalar() or 0
+                    "tasks_count": project_stats["total"],
+                    "tasks_done": project_stats["done"]
                 }
             })
 
@@ -937,6 +876,7 @@ async def search_public_projects(
         )
 
 @router.get("/by-hash/{project_hash}")
+@read_only
 async def get_project_by_hash_exact(
     project_hash: str,
     current_user: User = Depends(get_current_user),
@@ -1020,11 +960,7 @@ async def approve_join_request(
         logger.info(f"Approving join request {request_id} for project {project_hash}")
 
         # Находим проект
-        result = await db.execute(select(Project).where(Project.hash == project_hash))
-        project = result.scalar_one_or_none()
-        if not project:
-            logger.error(f"Project not found: {project_hash}")
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = await resolve_project(project_hash, db)
 
         # Проверяем права доступа
         membership = await db.execute(
@@ -1115,10 +1051,7 @@ async def reject_join_request(
         logger.info(f"Rejecting join request {request_id} for project {project_hash}")
 
         # Находим проект
-        result = await db.execute(select(Project).where(Project.hash == project_hash))
-        project = result.scalar_one_or_none()
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = await resolve_project(project_hash, db)
 
         # Проверяем права доступа
         membership = await db.execute(
@@ -1192,11 +1125,13 @@ async def regenerate_invite(
         raise HTTPException(status_code=403, detail="Access denied")
 
     new_hash = generate_invite_hash()
+    await invalidation_bus.publish(db, f"project_hash:{project.hash}")
     project.hash = new_hash
     await db.commit()
     return {"status": "success", "new_invite_hash": new_hash}
 
 @router.get("/{project_hash}/summary")
+@read_only
 async def get_project_summary(
     project_hash: str,
     current_user: User = Depends(get_current_user),
@@ -1263,3 +1198,80 @@ async def get_project_summary(
         "user_role": member.role,
         "can_manage": member.role in [ProjectRole.OWNER, ProjectRole.ADMIN]
     }
+
+@router.get("/{project_hash}/board")
+@read_only
+async def get_project_board(
+    project_hash: str,
+    per_column: int = Query(20, ge=1, le=100, description="Задач в каждой колонке"),
+    status_filter: Optional[TaskStatus] = Query(None, alias="status", description="Догрузить одну колонку"),
+    cursor: Optional[str] = Query(None, description="next_cursor колонки"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Доска проекта: первые per_column задач каждого статуса и число задач в колонке.
+
+    Все колонки выбираются одним запросом с row_number() по статусу, поэтому
+    размер ответа и число запросов не зависят от размера проекта. Следующая
+    страница колонки - тот же эндпоинт со status и cursor этой колонки.
+    """
+    project = await resolve_project(project_hash, db)
+
+    membership = await db.execute(
+        select(ProjectMember.id).where(
+            ProjectMember.project_id == project.id,
+            ProjectMember.user_id == current_user.id
+        )
+    )
+    if membership.scalar_one_or_none() is None:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    if cursor and status_filter is None:
+        raise HTTPException(status_code=400, detail="cursor requires status")
+
+    # Окно считается по индексу ix_tasks_project_board без чтения таблицы,
+    # строки задач читаются только для попавших на доску
+    ranked = select(
+        Task.id,
+        Task.status,
+        Task.created_at,
+        func.row_number().over(
+            partition_by=Task.status, order_by=(Task.created_at.desc(), Task.id.desc())
+        ).label("position"),
+        func.count().over(partition_by=Task.status).label("column_total"),
+    ).where(Task.project_id == project.id)
+    if status_filter is not None:
+        ranked = ranked.where(Task.status == status_filter)
+    ranked = ranked.subquery()
+
+    stmt = select(Task, ranked.c.position, ranked.c.column_total).join(ranked, Task.id == ranked.c.id)
+    if cursor:
+        created_at, task_id = decode_cursor(cursor, 2)
+        try:
+            position = (datetime.fromisoformat(created_at), int(task_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(ranked.c.created_at, ranked.c.id) < tuple_(*position))
+        stmt = stmt.order_by(ranked.c.position).limit(per_column + 1)
+    else:
+        stmt = stmt.where(ranked.c.position <= per_column + 1).order_by(ranked.c.status, ranked.c.position)
+    rows = (await db.execute(stmt)).all()
+
+    columns = {
+        column.value: {"status": column.value, "tasks": [], "total": 0, "next_cursor": None}
+        for column in TaskStatus
+        if status_filter is None or column == status_filter
+    }
+    for task, _, column_total in rows:
+        column = columns.setdefault(task.status, {"status": task.status, "tasks": [], "total": 0, "next_cursor": None})
+        column["total"] = column_total
+        column["tasks"].append(task)
+
+    # Лишняя задача в колонке означает, что есть следующая страница
+    for column in columns.values():
+        if len(column["tasks"]) > per_column:
+            column["tasks"] = column["tasks"][:per_column]
+            last = column["tasks"][-1]
+            column["next_cursor"] = encode_cursor(last.created_at, last.id)
+
+    return {"columns": list(columns.values())}
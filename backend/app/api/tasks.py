@@ -1,14 +1,16 @@
 # backend/app/api/tasks.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from app.database import get_db
-from app.models import User, Project, ProjectMember, Task, Comment, TaskDependency
-from app.api.deps import get_current_user
+from sqlalchemy import select, and_, or_, case, func, true, tuple_, literal_column, literal, exists, Date, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from app.database import get_db, read_only
+from app.models import User, Project, ProjectMember, Task, Comment, TaskDependency, UserSettings
+from app.api.deps import get_current_user, resolve_project, encode_cursor, decode_cursor, get_tasks_comment_previews
 from app.models.enums import ProjectRole, TaskStatus, TaskPriority
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,7 +58,21 @@ async def check_project_manage_access(project_id: int, user_id: int, db: AsyncSe
     member = membership.scalar_one_or_none()
     return member is not None and member.role in [ProjectRole.OWNER, ProjectRole.ADMIN]
 
+async def _embed_comment_previews(tasks: list, db: AsyncSession):
+    """Добавляет comment_count и latest_comment к задачам страницы (ORM-объектам или словарям)"""
+    previews = await get_tasks_comment_previews(
+        [task["id"] if isinstance(task, dict) else task.id for task in tasks], db
+    )
+    for task in tasks:
+        if isinstance(task, dict):
+            task.update(previews[task["id"]])
+        else:
+            preview = previews[task.id]
+            task.comment_count = preview["comment_count"]
+            task.latest_comment = preview["latest_comment"]
+
 @router.get("/")
+@read_only
 async def get_user_tasks(
     status: TaskStatus = Query(None, description="Фильтр по статусу"),
     project_hash: str = Query(None, description="Фильтр по проекту"),
@@ -98,6 +114,406 @@ async def get_user_tasks(
             detail="Internal server error"
         )
 
+# Сортировки /tasks/query: выражение и разбор значения из курсора
+_PRIORITY_RANK = case(
+    {TaskPriority.LOW.value: 1, TaskPriority.MEDIUM.value: 2, TaskPriority.HIGH.value: 3, TaskPriority.URGENT.value: 4},
+    value=Task.priority,
+    else_=0
+)
+_STATUS_RANK = case(
+    {TaskStatus.TODO.value: 1, TaskStatus.IN_PROGRESS.value: 2, TaskStatus.DONE.value: 3},
+    value=Task.status,
+    else_=0
+)
+# Задачи без срока считаются самыми ранними, как и при сортировке в клиенте
+_NO_DUE_DATE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_SORT_KEYS = {
+    "created_at": (Task.created_at, datetime.fromisoformat),
+    "due_date": (func.coalesce(Task.due_date, _NO_DUE_DATE), datetime.fromisoformat),
+    "priority": (_PRIORITY_RANK, int),
+    "status": (_STATUS_RANK, int),
+    "title": (Task.title, str),
+}
+
+def _split_values(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+def _enum_values(value: Optional[str], enum, name: str) -> List[str]:
+    values = _split_values(value)
+    allowed = {item.value for item in enum}
+    invalid = [item for item in values if item not in allowed]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {', '.join(invalid)}")
+    return values
+
+def _decode_cursor(cursor: str, sort: str, order: str):
+    cursor_sort, cursor_order, value, task_id = decode_cursor(cursor, 4)
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return _SORT_KEYS[sort][1](value), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/query")
+@read_only
+async def query_tasks(
+    projects: Optional[str] = Query(None, description="Хэши проектов через запятую"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Статусы через запятую"),
+    priority: Optional[str] = Query(None, description="Приоритеты через запятую"),
+    assignee: Optional[str] = Query(None, description="ID исполнителей через запятую, me или unassigned"),
+    created_by: Optional[str] = Query(None, description="ID автора или me"),
+    due_from: Optional[datetime] = Query(None, description="Срок не раньше (включительно)"),
+    due_to: Optional[datetime] = Query(None, description="Срок раньше (не включительно)"),
+    has_due_date: Optional[bool] = Query(None, description="Только задачи со сроком или без"),
+    q: Optional[str] = Query(None, min_length=1, max_length=200, description="Поиск по названию и описанию"),
+    sort: str = Query("created_at", description="created_at, due_date, priority, status или title"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(50, ge=1, le=200),
+    include_comments: bool = Query(False, description="Добавить comment_count и latest_comment"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Задачи из проектов пользователя с фильтрами, сортировкой и курсорной пагинацией.
+
+    facets - число задач по статусам, приоритетам и исполнителям. Счетчик
+    каждого измерения учитывает все фильтры, кроме фильтра по самому
+    измерению, чтобы клиент видел, сколько задач даст другой выбор.
+    Все счетчики считаются одним запросом с GROUPING SETS.
+    """
+    try:
+        if sort not in _SORT_KEYS:
+            raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}")
+        statuses = _enum_values(status_filter, TaskStatus, "status")
+        priorities = _enum_values(priority, TaskPriority, "priority")
+
+        # Общие фильтры: доступ, проекты, автор, сроки, текст
+        filters = [
+            Task.project_id.in_(
+                select(ProjectMember.project_id).where(ProjectMember.user_id == current_user.id)
+            )
+        ]
+        project_hashes = _split_values(projects)
+        if project_hashes:
+            project_ids = [(await resolve_project(project_hash, db)).id for project_hash in project_hashes]
+            filters.append(Task.project_id.in_(project_ids))
+        if created_by:
+            if created_by == "me":
+                filters.append(Task.created_by == current_user.id)
+            elif created_by.isdigit():
+                filters.append(Task.created_by == int(created_by))
+            else:
+                raise HTTPException(status_code=400, detail="Invalid created_by")
+        if due_from is not None:
+            filters.append(Task.due_date >= due_from)
+        if due_to is not None:
+            filters.append(Task.due_date < due_to)
+        if has_due_date is not None:
+            filters.append(Task.due_date.isnot(None) if has_due_date else Task.due_date.is_(None))
+        if q:
+            pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            filters.append(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+
+        # Фильтры по измерениям фасетов
+        status_ok = Task.status.in_(statuses) if statuses else true()
+        priority_ok = Task.priority.in_(priorities) if priorities else true()
+        assignee_ok = true()
+        assignees = _split_values(assignee)
+        if assignees:
+            conditions = []
+            ids = []
+            for item in assignees:
+                if item == "me":
+                    ids.append(current_user.id)
+                elif item == "unassigned":
+                    conditions.append(Task.assigned_to_id.is_(None))
+                elif item.isdigit():
+                    ids.append(int(item))
+                else:
+                    raise HTTPException(status_code=400, detail=f"Invalid assignee: {item}")
+            if ids:
+                conditions.append(Task.assigned_to_id.in_(ids))
+            assignee_ok = or_(*conditions)
+
+        sort_expr = _SORT_KEYS[sort][0]
+        sort_key = (sort_expr, Task.id)
+        stmt = (
+            select(Task, sort_expr.label("sort_value"))
+            .where(*filters, status_ok, priority_ok, assignee_ok)
+        )
+        if cursor:
+            value, task_id = _decode_cursor(cursor, sort, order)
+            position = tuple_(*sort_key)
+            stmt = stmt.where(position > tuple_(value, task_id) if order == "asc" else position < tuple_(value, task_id))
+        # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+        stmt = stmt.order_by(*(column.asc() if order == "asc" else column.desc() for column in sort_key))
+        rows = (await db.execute(stmt.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Битовая маска GROUPING: 1 - колонка не входит в набор группировки
+        grouping = func.grouping(Task.status, Task.priority, Task.assigned_to_id).label("grouping")
+        facet_rows = (await db.execute(
+            select(
+                grouping,
+                Task.status,
+                Task.priority,
+                Task.assigned_to_id,
+                func.count().filter(and_(priority_ok, assignee_ok)).label("by_status"),
+                func.count().filter(and_(status_ok, assignee_ok)).label("by_priority"),
+                func.count().filter(and_(status_ok, priority_ok)).label("by_assignee"),
+                func.count().filter(and_(status_ok, priority_ok, assignee_ok)).label("total"),
+            )
+            .where(*filters)
+            .group_by(func.grouping_sets(
+                tuple_(Task.status), tuple_(Task.priority), tuple_(Task.assigned_to_id), tuple_()
+            ))
+        )).all()
+
+        facets = {"status": {}, "priority": {}, "assignee": {}}
+        total = 0
+        for row in facet_rows:
+            if row.grouping == 0b011 and row.by_status:
+                facets["status"][row.status] = row.by_status
+            elif row.grouping == 0b101 and row.by_priority:
+                facets["priority"][row.priority] = row.by_priority
+            elif row.grouping == 0b110 and row.by_assignee:
+                key = str(row.assigned_to_id) if row.assigned_to_id is not None else "unassigned"
+                facets["assignee"][key] = row.by_assignee
+            elif row.grouping == 0b111:
+                total = row.total
+
+        next_cursor = None
+        if has_more:
+            last_task, last_value = rows[-1]
+            next_cursor = encode_cursor(sort, order, last_value, last_task.id)
+
+        tasks = [task for task, _ in rows]
+        if include_comments:
+            await _embed_comment_previews(tasks, db)
+
+        return {
+            "tasks": tasks,
+            "total": total,
+            "facets": facets,
+            "next_cursor": next_cursor,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error querying tasks for user {current_user.max_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+# Условие частичных индексов ix_tasks_*_open: литерал, а не параметр, иначе
+# планировщик не сможет доказать совпадение с индексом в общем плане
+_OPEN_TASK = Task.status != literal_column("'done'")
+
+_MY_TASK_SCOPES = {
+    "assigned": Task.assigned_to_id,
+    "created": Task.created_by,
+}
+
+def _due_bucket(now: datetime, soon: datetime):
+    """Корзина срока: overdue, due_soon, later или no_due_date"""
+    return case(
+        (Task.due_date.is_(None), "no_due_date"),
+        (Task.due_date < now, "overdue"),
+        (Task.due_date < soon, "due_soon"),
+        else_="later"
+    )
+
+@router.get("/mine")
+@read_only
+async def get_my_tasks(
+    scope: str = Query("assigned", pattern="^(assigned|created)$", description="Назначенные мне или созданные мной"),
+    bucket: Optional[str] = Query(None, pattern="^(overdue|due_soon|later|no_due_date)$", description="Только задачи этой корзины срока"),
+    due_soon_days: int = Query(3, ge=1, le=30, description="Сколько дней считается «скоро срок»"),
+    limit: int = Query(100, ge=1, le=500),
+    include_comments: bool = Query(False, description="Добавить comment_count и latest_comment"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Незавершенные задачи, назначенные пользователю или созданные им.
+
+    Выборка идет по частичным индексам на assigned_to_id / created_by, поэтому
+    не зависит от размера проектов. Сортировка по сроку, задачи без срока в конце.
+    buckets - число задач в каждой корзине срока без учета bucket и limit.
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        due_bucket = _due_bucket(now, now + timedelta(days=due_soon_days))
+        filters = [
+            _MY_TASK_SCOPES[scope] == current_user.id,
+            _OPEN_TASK,
+            # Задачи проектов, из которых пользователь вышел, не показываем
+            Task.project_id.in_(
+                select(ProjectMember.project_id).where(ProjectMember.user_id == current_user.id)
+            ),
+        ]
+
+        stmt = (
+            select(Task, Project.hash, Project.title, due_bucket.label("bucket"))
+            .join(Project, Task.project_id == Project.id)
+            .where(*filters)
+        )
+        if bucket:
+            stmt = stmt.where(due_bucket == bucket)
+        rows = (await db.execute(
+            stmt.order_by(Task.due_date.asc().nulls_last(), Task.id).limit(limit)
+        )).all()
+
+        bucket_rows = await db.execute(
+            select(due_bucket.label("bucket"), func.count()).where(*filters).group_by(due_bucket)
+        )
+        buckets = {"overdue": 0, "due_soon": 0, "later": 0, "no_due_date": 0}
+        buckets.update({name: count for name, count in bucket_rows.all()})
+
+        tasks = [
+            {
+                "id": task.id,
+                "title": task.title,
+                "description": task.description,
+                "status": task.status,
+                "priority": task.priority,
+                "project_id": task.project_id,
+                "project_hash": project_hash,
+                "project_title": project_title,
+                "created_by": task.created_by,
+                "assigned_to_id": task.assigned_to_id,
+                "parent_task_id": task.parent_task_id,
+                "due_date": task.due_date,
+                "created_at": task.created_at,
+                "updated_at": task.updated_at,
+                "bucket": task_bucket,
+            }
+            for task, project_hash, project_title, task_bucket in rows
+        ]
+        if include_comments:
+            await _embed_comment_previews(tasks, db)
+
+        return {
+            "tasks": tasks,
+            "buckets": buckets,
+            "total": buckets[bucket] if bucket else sum(buckets.values()),
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching {scope} tasks for user {current_user.max_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+# Самый длинный диапазон календаря: год в режиме дней
+CALENDAR_MAX_DAYS = 366
+
+async def _user_timezone(user_id: int, db: AsyncSession) -> str:
+    """Часовой пояс из настроек пользователя; UTC, если настроек нет или пояс неизвестен"""
+    tz_name = await db.scalar(select(UserSettings.timezone).where(UserSettings.user_id == user_id))
+    try:
+        ZoneInfo(tz_name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone '{tz_name}' for user {user_id}, using UTC")
+        return "UTC"
+    return tz_name or "UTC"
+
+@router.get("/calendar")
+@read_only
+async def get_calendar(
+    date_from: date = Query(..., alias="from", description="Первый день, YYYY-MM-DD"),
+    date_to: date = Query(..., alias="to", description="День после последнего, YYYY-MM-DD"),
+    projects: Optional[str] = Query(None, description="Хэши проектов через запятую"),
+    mode: str = Query("tasks", pattern="^(tasks|days)$", description="tasks - задачи, days - число задач по дням"),
+    limit: int = Query(500, ge=1, le=2000, description="Максимум задач в режиме tasks"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Задачи со сроком в диапазоне [from, to) из проектов пользователя.
+
+    Дни считаются в часовом поясе из настроек пользователя. В режиме days
+    возвращается только число задач (и выполненных) на каждый день - для
+    месячной сетки не нужно загружать сами задачи.
+    """
+    try:
+        if date_to <= date_from:
+            raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+        if (date_to - date_from).days > CALENDAR_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"Range is limited to {CALENDAR_MAX_DAYS} days")
+
+        tz_name = await _user_timezone(current_user.id, db)
+        tz = ZoneInfo(tz_name)
+        filters = [
+            Task.project_id.in_(
+                select(ProjectMember.project_id).where(ProjectMember.user_id == current_user.id)
+            ),
+            Task.due_date >= datetime.combine(date_from, time.min, tzinfo=tz),
+            Task.due_date < datetime.combine(date_to, time.min, tzinfo=tz),
+        ]
+        project_hashes = _split_values(projects)
+        if project_hashes:
+            project_ids = [(await resolve_project(project_hash, db)).id for project_hash in project_hashes]
+            filters.append(Task.project_id.in_(project_ids))
+
+        # День срока в поясе пользователя
+        due_day = func.timezone(tz_name, Task.due_date).cast(Date)
+
+        if mode == "days":
+            rows = (await db.execute(
+                select(
+                    due_day.label("day"),
+                    func.count().label("count"),
+                    func.count().filter(Task.status == TaskStatus.DONE).label("done"),
+                )
+                .where(*filters)
+                .group_by(due_day)
+                .order_by(due_day)
+            )).all()
+            return {
+                "timezone": tz_name,
+                "days": [{"date": row.day, "count": row.count, "done": row.done} for row in rows],
+            }
+
+        rows = (await db.execute(
+            select(Task, Project.hash, Project.title, due_day.label("day"))
+            .join(Project, Task.project_id == Project.id)
+            .where(*filters)
+            .order_by(Task.due_date, Task.id)
+            .limit(limit + 1)
+        )).all()
+        truncated = len(rows) > limit
+
+        tasks = [
+            {
+                "id": task.id,
+                "title": task.title,
+                "status": task.status,
+                "priority": task.priority,
+                "project_id": task.project_id,
+                "project_hash": project_hash,
+                "project_title": project_title,
+                "assigned_to_id": task.assigned_to_id,
+                "due_date": task.due_date,
+                "day": day,
+            }
+            for task, project_hash, project_title, day in rows[:limit]
+        ]
+        return {"timezone": tz_name, "tasks": tasks, "truncated": truncated}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching calendar for user {current_user.max_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 @router.post("/")
 async def create_task(
     task_data: TaskCreate,
@@ -107,10 +523,7 @@ async def create_task(
     try:
         logger.info(f"Creating task for user: {current_user.max_id}")
 
-        result = await db.execute(select(Project).where(Project.hash == task_data.project_hash))
-        project = result.scalar_one_or_none()
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = await resolve_project(task_data.project_hash, db)
 
         has_access = await check_project_access(project.id, current_user.id, db)
         if not has_access:
@@ -286,7 +699,116 @@ async def update_task_status(
             detail="Internal server error"
         )
 
+# Ограничение глубины дерева подзадач: защита от очень глубоких и циклических цепочек
+TREE_MAX_DEPTH = 20
+
+def _tree_node(task: Task, depth: int) -> dict:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "status": task.status,
+        "priority": task.priority,
+        "assigned_to_id": task.assigned_to_id,
+        "due_date": task.due_date,
+        "parent_task_id": task.parent_task_id,
+        "depth": depth,
+        "subtasks": [],
+    }
+
+def _rollup(node: dict) -> dict:
+    """Счетчики подзадач узла: прямые, все потомки, выполненные потомки и процент"""
+    descendants = done = 0
+    for child in node["subtasks"]:
+        _rollup(child)
+        descendants += 1 + child["descendant_count"]
+        done += (child["status"] == TaskStatus.DONE) + child["done_count"]
+    node["subtask_count"] = len(node["subtasks"])
+    node["descendant_count"] = descendants
+    node["done_count"] = done
+    node["done_percent"] = round(done * 100 / descendants) if descendants else None
+    return node
+
+@router.get("/{task_id}/tree")
+@read_only
+async def get_task_tree(
+    task_id: int,
+    max_depth: int = Query(10, ge=1, le=TREE_MAX_DEPTH, description="Сколько уровней подзадач вернуть"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Задача со всеми подзадачами на max_depth уровней вниз одним рекурсивным запросом.
+
+    У каждого узла depth и сводка по его поддереву: subtask_count (прямые
+    подзадачи), descendant_count, done_count и done_percent. truncated -
+    ниже max_depth есть еще подзадачи, в сводку они не вошли.
+    """
+    try:
+        # Путь от корня исключает циклы, если parent_task_id когда-то замкнули в кольцо
+        tree = (
+            select(
+                Task.id,
+                literal(0, Integer).label("depth"),
+                array([Task.id], type_=Integer).label("path"),
+            )
+            .where(Task.id == task_id)
+            .cte("task_tree", recursive=True)
+        )
+        child = Task.__table__.alias("child")
+        tree = tree.union_all(
+            select(
+                child.c.id,
+                (tree.c.depth + 1).label("depth"),
+                tree.c.path.op("||")(child.c.id).label("path"),
+            )
+            .join(tree, child.c.parent_task_id == tree.c.id)
+            # Один уровень сверх max_depth - только чтобы узнать, что дерево обрезано
+            .where(tree.c.depth <= max_depth, ~tree.c.path.any(child.c.id))
+        )
+
+        has_access = exists().where(
+            ProjectMember.project_id == Task.project_id,
+            ProjectMember.user_id == current_user.id
+        )
+        rows = (await db.execute(
+            select(Task, tree.c.depth, has_access.label("has_access"))
+            .join(tree, Task.id == tree.c.id)
+            .order_by(tree.c.path)
+        )).all()
+
+        if not rows:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if not rows[0].has_access:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        # Строки идут в порядке пути, поэтому родитель всегда раньше потомков
+        nodes = {}
+        truncated = False
+        for task, depth, _ in rows:
+            if depth > max_depth:
+                truncated = True
+                continue
+            node = _tree_node(task, depth)
+            nodes[task.id] = node
+            if depth > 0:
+                nodes[task.parent_task_id]["subtasks"].append(node)
+
+        return {
+            "task": _rollup(nodes[task_id]),
+            "max_depth": max_depth,
+            "truncated": truncated,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching tree for task {task_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 @router.get("/{task_id}/dependencies")
+@read_only
 async def get_task_dependencies(
     task_id: int,
     current_user: User = Depends(get_current_user),
@@ -401,6 +923,7 @@ async def check_circular_dependency(task_id: int, depends_on_id: int, db: AsyncS
     return False
 
 @router.get("/{task_id}/comments")
+@read_only
 async def get_task_comments(
     task_id: int,
     current_user: User = Depends(get_current_user),
@@ -500,6 +1023,7 @@ async def delete_task(
         )
 
 @router.get("/{task_id}")
+@read_only
 async def get_task(
     task_id: int,
     current_user: User = Depends(get_current_user),
@@ -537,6 +1061,7 @@ async def get_task(
         )
 
 @router.get("/projects/{project_hash}/tasks")
+@read_only
 async def get_project_tasks(
     project_hash: str,
     current_user: User = Depends(get_current_user),
@@ -545,13 +1070,7 @@ async def get_project_tasks(
     """Получить все задачи конкретного проекта по его hash"""
     try:
         # Найти проект по hash
-        project_result = await db.execute(
-            select(Project).where(Project.hash == project_hash)
-        )
-        project = project_result.scalar_one_or_none()
-
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
+        project = await resolve_project(project_hash, db)
 
         # Проверка доступа
         has_access = await check_project_access(project.id, current_user.id, db)
@@ -1,20 +1,28 @@
 # backend/app/api/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
-from app.database import get_db
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import aliased, selectinload
+from app.database import get_db, read_only, read_session
 from app.models import User, ProjectMember, Project, Task, UserSettings
-from app.api.deps import get_current_user
+from app.models.enums import ProjectRole
+from app.api.deps import get_current_user, get_projects_task_stats
 from app.core.exceptions import NotFoundException, ForbiddenException
+from app.core.metrics import register_singleflight
+from app.core.singleflight import SingleFlight
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
+from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Одновременные запросы списка проектов одного пользователя выполняются один раз
+user_projects_flight = SingleFlight()
+register_singleflight("user_projects", user_projects_flight)
+
 # Pydantic модели
 class UserPreferences(BaseModel):
     theme: Optional[str] = None
@@ -240,7 +248,63 @@ async def reset_user_preferences(
             detail="Internal server error"
         )
 
+# Ранг роли для выбора наивысшей роли участника среди общих проектов
+_ROLE_RANKS = [ProjectRole.GUEST, ProjectRole.MEMBER, ProjectRole.ADMIN, ProjectRole.OWNER]
+
+@router.get("/me/team")
+@read_only
+async def get_my_team(
+    limit: int = Query(20, ge=1, le=100, description="Сколько участников вернуть"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Участники всех проектов пользователя: число общих проектов и наивысшая роль.
+
+    Один запрос с группировкой; total - сколько всего участников без учета limit.
+    """
+    mine = aliased(ProjectMember)
+    other = aliased(ProjectMember)
+    role_rank = case(
+        {role.value: rank for rank, role in enumerate(_ROLE_RANKS)},
+        value=other.role,
+        else_=0
+    )
+    shared_projects = func.count(other.project_id).label("shared_projects")
+    top_role_rank = func.max(role_rank).label("role_rank")
+
+    result = await db.execute(
+        select(
+            User.id, User.max_id, User.full_name, User.username,
+            shared_projects, top_role_rank,
+            func.count().over().label("total")
+        )
+        .select_from(mine)
+        .join(other, (other.project_id == mine.project_id) & (other.user_id != current_user.id))
+        .join(User, User.id == other.user_id)
+        .where(mine.user_id == current_user.id, User.is_active == True)
+        .group_by(User.id)
+        .order_by(shared_projects.desc(), top_role_rank.desc(), User.full_name, User.id)
+        .limit(limit)
+    )
+    rows = result.all()
+
+    return {
+        "team": [
+            {
+                "id": row.id,
+                "max_id": row.max_id,
+                "full_name": row.full_name,
+                "username": row.username,
+                "shared_projects": row.shared_projects,
+                "role": _ROLE_RANKS[row.role_rank].value,
+            }
+            for row in rows
+        ],
+        "total": rows[0].total if rows else 0,
+    }
+
 @router.get("/{user_id}")
+@read_only
 async def get_user(
     user_id: str,
     current_user: User = Depends(get_current_user),
@@ -287,7 +351,81 @@ async def get_user(
             detail="Internal server error"
         )
 
+async def _load_user_projects(user_id: int, principal: str) -> list:
+    """Собирает проекты в собственной сессии, чтобы результат можно было разделить между запросами"""
+    async with read_session(principal) as session:
+        return await _build_user_projects(user_id, session)
+
+async def _build_user_projects(user_id: int, db: AsyncSession) -> list:
+    """Проекты пользователя со статистикой и участниками"""
+    result = await db.execute(
+        select(ProjectMember)
+        .where(ProjectMember.user_id == user_id)
+        .options(selectinload(ProjectMember.member_project))
+    )
+    memberships = result.scalars().all()
+
+    project_ids = [member.project_id for member in memberships]
+
+    # Статистика и участники всех проектов - по одному запросу, а не по запросу на проект
+    task_stats = await get_projects_task_stats(project_ids, db)
+    members_result = await db.execute(
+        select(ProjectMember)
+        .where(ProjectMember.project_id.in_(project_ids))
+        .options(selectinload(ProjectMember.member_user))
+    )
+    members_by_project = defaultdict(list)
+    for project_member in members_result.scalars().all():
+        members_by_project[project_member.project_id].append(project_member)
+
+    projects_with_stats = []
+
+    for member in memberships:
+        project = member.member_project
+        project_stats = task_stats[project.id]
+
+        stats = {
+            "tasks_count": project_stats["total"],
+            "tasks_done": project_stats["done"],
+            "tasks_in_progress": project_stats["in_progress"],
+            "tasks_todo": project_stats["todo"]
+        }
+
+        project_members = members_by_project[project.id]
+
+        project_data = {
+            "id": project.id,
+            "title": project.title,
+            "description": project.description,
+            "hash": project.hash,
+            "is_private": project.is_private,
+            "requires_approval": project.requires_approval,
+            "created_by": project.created_by,
+            "created_at": project.created_at,
+            "updated_at": project.updated_at,
+            "members": [
+                {
+                    "user_id": m.user_id,
+                    "role": m.role,
+                    "user": {
+                        "id": m.member_user.id,
+                        "max_id": m.member_user.max_id,
+                        "full_name": m.member_user.full_name,
+                        "username": m.member_user.username
+                    } if m.member_user else None
+                } for m in project_members
+            ],
+            "stats": stats
+        }
+        projects_with_stats.append({
+            "project": project_data,
+            "role": member.role
+        })
+
+    return projects_with_stats
+
 @router.get("/{user_id}/projects")
+@read_only
 async def get_user_projects(
     user_id: str,
     current_user: User = Depends(get_current_user),
@@ -317,82 +455,9 @@ async def get_user_projects(
         if not target_user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        result = await db.execute(
-            select(ProjectMember)
-            .where(ProjectMember.user_id == target_user.id)
-            .options(selectinload(ProjectMember.member_project))
+        projects_with_stats = await user_projects_flight.do(
+            target_user.id, lambda: _load_user_projects(target_user.id, current_user.max_id)
         )
-        memberships = result.scalars().all()
-
-        projects_with_stats = []
-
-        for member in memberships:
-            project = member.member_project
-
-            total_result = await db.execute(
-                select(func.count(Task.id)).where(Task.project_id == project.id)
-            )
-            done_result = await db.execute(
-                select(func.count(Task.id)).where(
-                    Task.project_id == project.id,
-                    Task.status == 'done'
-                )
-            )
-            in_progress_result = await db.execute(
-                select(func.count(Task.id)).where(
-                    Task.project_id == project.id,
-                    Task.status == 'in_progress'
-                )
-            )
-            todo_result = await db.execute(
-                select(func.count(Task.id)).where(
-                    Task.project_id == project.id,
-                    Task.status == 'todo'
-                )
-            )
-
-            stats = {
-                "tasks_count": total_result.scalar() or 0,
-                "tasks_done": done_result.scalar() or 0,
-                "tasks_in_progress": in_progress_result.scalar() or 0,
-                "tasks_todo": todo_result.scalar() or 0
-            }
-
-            members_result = await db.execute(
-                select(ProjectMember)
-                .where(ProjectMember.project_id == project.id)
-                .options(selectinload(ProjectMember.member_user))
-            )
-            project_members = members_result.scalars().all()
-
-            project_data = {
-                "id": project.id,
-                "title": project.title,
-                "description": project.description,
-                "hash": project.hash,
-                "is_private": project.is_private,
-                "requires_approval": project.requires_approval,
-                "created_by": project.created_by,
-                "created_at": project.created_at,
-                "updated_at": project.updated_at,
-                "members": [
-                    {
-                        "user_id": m.user_id,
-                        "role": m.role,
-                        "user": {
-                            "id": m.member_user.id,
-                            "max_id": m.member_user.max_id,
-                            "full_name": m.member_user.full_name,
-                            "username": m.member_user.username
-                        } if m.member_user else None
-                    } for m in project_members
-                ],
-                "stats": stats
-            }
-            projects_with_stats.append({
-                "project": project_data,
-                "role": member.role
-            })
 
         logger.info(f"Successfully fetched {len(projects_with_stats)} projects for user: {target_user_id}")
         return {"projects": projects_with_stats}
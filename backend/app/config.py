@@ -1,6 +1,6 @@
 # backend/app/config.py
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
@@ -9,6 +9,45 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     SITE_URL: str
     BACKEND_API_URL: str
+    SERVICE_API_KEY: Optional[str] = None
+    DEBUG: bool = False
+    # Пул соединений и драйвер asyncpg
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 5
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_CONNECT_TIMEOUT: float = 10.0
+    DB_COMMAND_TIMEOUT: Optional[float] = 60.0
+    # Сколько секунд /health/ready ждет ответа БД
+    DB_READINESS_TIMEOUT: float = 2.0
+    # Реплики для чтения через запятую; после записи пользователь читает из основной БД столько секунд
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Прямое подключение к Postgres для LISTEN (сброс кэшей); через PgBouncer в режиме transaction
+    # уведомления не доставляются. Пусто - используется DATABASE_URL
+    DATABASE_LISTEN_URL: Optional[str] = None
+    # Сколько проектов держать в кэше hash -> проект (0 - выключен) и сколько секунд хранить запись
+    PROJECT_CACHE_SIZE: int = 10000
+    PROJECT_CACHE_TTL_SECONDS: float = 300.0
+    # Сколько раз один SQL-шаблон может повториться за запрос до предупреждения о N+1
+    QUERY_REPEAT_THRESHOLD: int = 5
+    # Ключ для административных эндпоинтов и профилирования запросов (X-Admin-Key)
+    ADMIN_API_KEY: Optional[str] = None
+    PROFILER_SAMPLE_INTERVAL_MS: float = 1.0
+    PROFILER_MAX_PROFILES: int = 50
+    # Журнал медленных запросов: порог (0 - выключен), размер буфера, доля запросов с EXPLAIN ANALYZE
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_SIZE: int = 500
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 5000
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in (self.DATABASE_REPLICA_URLS or "").split(",") if url.strip()]
 
     @classmethod
     def parse_env_var(cls, field_name: str, raw_val: str):
@@ -0,0 +1,169 @@
+# backend/app/core/invalidation.py
+"""
+Инвалидация кэшей между воркерами через Postgres LISTEN/NOTIFY.
+
+Каждый воркер держит одно отдельное соединение asyncpg (вне пула SQLAlchemy)
+и слушает канал CHANNEL. Код, который меняет данные, публикует ключи вида
+"<сущность>:<id>" в своей сессии - NOTIFY транзакционный, поэтому уведомление
+уходит только после коммита и только если коммит прошел. Уведомление
+получают все воркеры, включая отправителя, и вызывают обработчики,
+подписанные на сущность.
+
+Пока соединение разорвано, уведомления теряются, поэтому после каждого
+переподключения обработчики получают id=None - сбросить кэш целиком.
+Отправитель, кроме того, сбрасывает свои кэши сам сразу после коммита: не
+ждет уведомления и не зависит от того, подключен ли слушатель.
+
+LISTEN требует постоянного сессионного соединения: через PgBouncer в режиме
+transaction подписка проходит, но уведомления не доставляются. Поэтому
+слушатель подключается к Postgres напрямую (DATABASE_LISTEN_URL).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Лимит полезной нагрузки NOTIFY - 8000 байт, оставляем запас
+MAX_PAYLOAD = 7000
+
+RECONNECT_DELAYS = (0.5, 1, 2, 5, 10, 30)
+
+# Проверка соединения, если давно не было уведомлений: обрыв сети не всегда закрывает сокет
+KEEPALIVE_INTERVAL = 30
+
+# Ключи, опубликованные в текущей транзакции сессии (Session.info)
+_PENDING_KEYS = "invalidation_pending_keys"
+
+Handler = Callable[[Optional[str]], None]
+
+
+def _dsn(database_url: str) -> str:
+    """URL SQLAlchemy (postgresql+asyncpg://) в DSN для asyncpg"""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _payloads(keys: Iterable[str]) -> List[str]:
+    payloads, current = [], ""
+    for key in dict.fromkeys(keys):
+        if current and len(current) + len(key) + 1 > MAX_PAYLOAD:
+            payloads.append(current)
+            current = ""
+        current = f"{current}\n{key}" if current else key
+    if current:
+        payloads.append(current)
+    return payloads
+
+
+class InvalidationBus:
+    def __init__(self, channel: str = CHANNEL):
+        self.channel = channel
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._dsn: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+
+    def subscribe(self, entity: str, handler: Handler):
+        """handler(id) вызывается для каждого ключа "<entity>:<id>"; handler(None) - сбросить все"""
+        self._handlers[entity].append(handler)
+
+    async def publish(self, db: AsyncSession, *keys: str):
+        """Ставит уведомление в транзакцию сессии: воркеры получат его после коммита"""
+        for payload in _payloads(keys):
+            await db.execute(select(func.pg_notify(self.channel, payload)))
+        db.sync_session.info.setdefault(_PENDING_KEYS, []).extend(keys)
+
+    def _after_commit(self, session: Session):
+        keys = session.info.pop(_PENDING_KEYS, None)
+        if keys:
+            # До коммита сбрасывать нельзя: параллельный запрос снова закэширует старую строку
+            self.dispatch(keys)
+
+    def _after_rollback(self, session: Session):
+        session.info.pop(_PENDING_KEYS, None)
+
+    def dispatch(self, keys: Iterable[str]):
+        for key in keys:
+            entity, _, entity_id = key.partition(":")
+            for handler in self._handlers.get(entity, ()):
+                try:
+                    handler(entity_id)
+                except Exception:
+                    logger.exception(f"Cache invalidation handler failed for {key}")
+
+    def _flush_all(self):
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                try:
+                    handler(None)
+                except Exception:
+                    logger.exception("Cache invalidation handler failed on flush")
+
+    def _on_notification(self, connection, pid, channel, payload):
+        self.received += 1
+        self.dispatch(payload.split("\n"))
+
+    async def start(self, database_url: str):
+        if self._task is None:
+            self._dsn = _dsn(database_url)
+            self._task = asyncio.create_task(self._listen(), name="cache-invalidation-listener")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        attempt = 0
+        while True:
+            connection = None
+            closed = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(self._dsn)
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notification)
+                if self.reconnects:
+                    # За время разрыва могли пропустить уведомления
+                    self._flush_all()
+                self.connected = True
+                attempt = 0
+                logger.info(f"Listening for cache invalidations on '{self.channel}'")
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), KEEPALIVE_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1", timeout=KEEPALIVE_INTERVAL)
+                logger.warning("Cache invalidation connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close(timeout=5)
+
+            self.reconnects += 1
+            delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+invalidation_bus = InvalidationBus()
+event.listen(Session, "after_commit", invalidation_bus._after_commit)
+event.listen(Session, "after_rollback", invalidation_bus._after_rollback)
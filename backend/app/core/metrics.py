@@ -0,0 +1,205 @@
+# backend/app/core/metrics.py
+"""
+Метрики в текстовом формате Prometheus без внешних зависимостей.
+
+Горячий путь (MetricsMiddleware) только увеличивает заранее созданные
+счетчики: набор меток создается один раз при первом появлении маршрута
+и статуса, дальше это поиск в словаре и инкремент элемента списка.
+Блокировок нет - все выполняется в одном цикле событий.
+Остальные показатели (пул БД, кэши, очереди) собираются при запросе /metrics.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Все запросы к несуществующим путям попадают в одну метку, чтобы не раздувать кардинальность
+UNMATCHED_ROUTE = "<unmatched>"
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class RequestMetrics:
+    """Количество запросов, гистограмма задержек по шаблону маршрута и статусу, запросы в работе"""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.in_flight = 0
+        self._series: Dict[Tuple[str, str, int], _HistogramSeries] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float):
+        key = (method, route, status)
+        series = self._series.get(key)
+        if series is None:
+            # +1 корзина для значений больше последней границы (+Inf)
+            series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+        series.buckets[bisect_left(self.buckets, duration)] += 1
+        series.count += 1
+        series.sum += duration
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP http_requests_total Total HTTP requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), series in self._series.items():
+            labels = _format_labels({"method": method, "route": route, "status": status})
+            lines.append(f"http_requests_total{labels} {series.count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency by route template and status.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), series in self._series.items():
+            base = {"method": method, "route": route, "status": status}
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"http_request_duration_seconds_bucket{_format_labels({**base, 'le': le})} {cumulative}")
+            lines.append(f"http_request_duration_seconds_count{_format_labels(base)} {series.count}")
+            lines.append(f"http_request_duration_seconds_sum{_format_labels(base)} {series.sum:.6f}")
+
+        lines += [
+            "# HELP http_requests_in_flight HTTP requests currently being processed.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        return lines
+
+
+class MetricsRegistry:
+    """HTTP-метрики плюс показатели, которые собираются функциями в момент чтения /metrics"""
+
+    def __init__(self):
+        self.requests = RequestMetrics()
+        self._families: Dict[str, Tuple[str, str, List[Callable[[], Iterable[Sample]]]]] = {}
+
+    def register(self, name: str, kind: str, help_text: str, collect: Callable[[], Iterable[Sample]]):
+        """collect возвращает [(метки, значение)]; несколько источников одного семейства объединяются"""
+        family = self._families.setdefault(name, (kind, help_text, []))
+        family[2].append(collect)
+
+    def register_gauge(self, name: str, help_text: str, value: Callable[[], float], labels: Dict[str, str] = None):
+        self.register(name, "gauge", help_text, lambda: [(labels or {}, value())])
+
+    def render(self) -> str:
+        lines = self.requests.render()
+        for name, (kind, help_text, collectors) in self._families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for collect in collectors:
+                for labels, value in collect():
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def register_pool_metrics(engine, max_overflow: int = 0):
+    """Состояние пула соединений SQLAlchemy"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    metrics.register_gauge("db_pool_size", "Configured pool size.", pool.size)
+    metrics.register_gauge("db_pool_max_overflow", "Configured overflow limit above pool size.", lambda: max_overflow)
+    metrics.register_gauge("db_pool_checked_out", "Connections currently checked out.", pool.checkedout)
+    metrics.register_gauge("db_pool_checked_in", "Idle connections in the pool.", pool.checkedin)
+    metrics.register_gauge("db_pool_overflow", "Connections opened beyond pool size.", pool.overflow)
+
+
+def register_read_routing(routing):
+    """Куда ушли сессии для чтения: реплика или основная БД (после записи или без реплик)"""
+    metrics.register("db_read_sessions_total", "counter", "Read-only sessions by target database.",
+                     lambda: [({"target": target}, count) for target, count in routing.items()])
+
+
+def register_invalidation_bus(bus):
+    """Слушатель LISTEN/NOTIFY: подключен ли, сколько уведомлений получено, сколько раз переподключался"""
+    metrics.register_gauge("cache_invalidation_connected", "Whether the LISTEN connection is up.",
+                           lambda: int(bus.connected))
+    metrics.register("cache_invalidation_notifications_total", "counter",
+                     "Invalidation notifications received.", lambda: [({}, bus.received)])
+    metrics.register("cache_invalidation_reconnects_total", "counter",
+                     "LISTEN connection reconnects.", lambda: [({}, bus.reconnects)])
+
+
+def register_cache(name: str, cache):
+    """Попадания, промахи и размер кэша в памяти процесса"""
+    labels = {"cache": name}
+    metrics.register("cache_hits_total", "counter", "In-process cache hits.", lambda: [(labels, cache.hits)])
+    metrics.register("cache_misses_total", "counter", "In-process cache misses.", lambda: [(labels, cache.misses)])
+    metrics.register_gauge("cache_entries", "Entries currently cached.", lambda: len(cache), labels)
+
+
+def register_singleflight(group: str, flight):
+    """Вызовы SingleFlight: всего, получившие уже выполняющийся результат, вычисления в работе"""
+    labels = {"group": group}
+    metrics.register("singleflight_calls_total", "counter", "Calls to a single-flight group.",
+                     lambda: [(labels, flight.calls)])
+    metrics.register("singleflight_shared_total", "counter", "Calls that reused an in-flight result.",
+                     lambda: [(labels, flight.shared)])
+    metrics.register_gauge("singleflight_in_flight", "Computations currently running.",
+                           lambda: flight.in_flight, labels)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: считает запросы и задержку по шаблону маршрута"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.requests = registry.requests
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requests = self.requests
+        status_holder = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        requests.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests.in_flight -= 1
+            route = scope.get("route")
+            requests.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_holder[0],
+                time.perf_counter() - started
+            )
+
+
+def register_slow_query_log(log):
+    """Медленные запросы и фоновые EXPLAIN"""
+    metrics.register("db_slow_queries_total", "counter", "SQL statements slower than the threshold.",
+                     lambda: [({}, log.total)])
+    metrics.register_gauge("db_slow_query_explains_in_flight", "Background EXPLAIN ANALYZE runs in progress.",
+                           lambda: log.explains_in_flight)
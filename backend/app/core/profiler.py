@@ -0,0 +1,198 @@
+# backend/app/core/profiler.py
+"""
+Профилирование отдельных запросов по требованию.
+
+Запрос с заголовком X-Profile: 1 (или ?profile=1) и верным X-Admin-Key
+выполняется под сэмплирующим профайлером: отдельный поток с заданным
+интервалом снимает стек потока цикла событий. Результат хранится в
+формате folded stacks ("frame;frame;frame count"), который понимают
+flamegraph.pl, speedscope и inferno. Время SQL добавляется отдельными
+ветками "[sql] <шаблон запроса>" по данным счетчика запросов, потому что
+пока запрос ждет БД, его корутина не на стеке.
+
+Профайлер видит весь поток цикла событий, поэтому параллельные запросы
+того же воркера тоже попадают в профиль - профилируйте на спокойном воркере.
+"""
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from app.config import settings
+from app.core.query_counter import current_stats
+from app.core.security import verify_admin_key
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Периодически снимает стек одного потока и считает одинаковые стеки"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        # Поток может быть посреди снятия стека - ждем его вне цикла событий
+        await asyncio.to_thread(self._thread.join)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class Profile:
+    def __init__(self, profile_id: int, method: str, path: str, interval: float):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.route = None
+        self.status = None
+        self.interval = interval
+        self.started_at = datetime.now(timezone.utc)
+        self.duration = 0.0
+        self.samples = Counter()
+        self.sql = []
+
+    def folded(self) -> str:
+        """Folded stacks; SQL-ветки взвешены по времени в единицах интервала сэмплирования"""
+        root = f"{self.method} {self.route or self.path}"
+        lines = [f"{root};{stack} {count}" for stack, count in self.samples.most_common()]
+        for item in self.sql:
+            weight = max(1, round(item["time_ms"] / 1000 / self.interval))
+            statement = item["statement"].replace(";", ",")
+            lines.append(f"{root};[sql] {statement} {weight}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+            "samples": sum(self.samples.values()),
+            "sample_interval_ms": self.interval * 1000,
+            "sql_queries": sum(item["count"] for item in self.sql),
+            "sql_time_ms": round(sum(item["time_ms"] for item in self.sql), 2),
+        }
+
+    def details(self, top: int = 30) -> dict:
+        # Собственное время функций: сколько раз функция была вершиной стека
+        leaf_counts = Counter()
+        for stack, count in self.samples.items():
+            leaf_counts[stack.rsplit(";", 1)[-1]] += count
+        return {
+            **self.summary(),
+            "sql": self.sql,
+            "top_functions": [
+                {"function": name, "samples": count} for name, count in leaf_counts.most_common(top)
+            ],
+        }
+
+
+class ProfileStore:
+    """Последние профили в ограниченном буфере"""
+
+    def __init__(self, max_profiles: int):
+        self._profiles: Deque[Profile] = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+
+    def new(self, method: str, path: str, interval: float) -> Profile:
+        return Profile(next(self._ids), method, path, interval)
+
+    def add(self, profile: Profile):
+        self._profiles.append(profile)
+
+    def list(self) -> List[dict]:
+        return [profile.summary() for profile in reversed(self._profiles)]
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        return next((p for p in self._profiles if p.id == profile_id), None)
+
+
+profile_store = ProfileStore(settings.PROFILER_MAX_PROFILES)
+
+
+class ProfilerMiddleware:
+    """Включает профайлер для отдельных запросов администратора.
+
+    Должен стоять внутри QueryCounterMiddleware, чтобы видеть статистику SQL запроса.
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store, interval: float = 0.001):
+        self.app = app
+        self.store = store
+        self.interval = interval
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        headers: Dict[bytes, bytes] = dict(scope.get("headers") or [])
+        flag = headers.get(b"x-profile", b"").decode()
+        if not flag:
+            query = parse_qs(scope.get("query_string", b"").decode())
+            flag = (query.get("profile") or [""])[0]
+        if flag not in ("1", "true"):
+            return False
+        return verify_admin_key(headers.get(b"x-admin-key", b"").decode() or None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.store.new(scope["method"], scope["path"], self.interval)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile.id).encode())
+                ]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            await sampler.stop()
+            profile.duration = time.perf_counter() - started
+            profile.samples = sampler.samples
+            profile.route = getattr(scope.get("route"), "path", None)
+            stats = current_stats()
+            if stats is not None:
+                profile.sql = [
+                    {
+                        "statement": statement,
+                        "count": count,
+                        "time_ms": round(stats.statement_time[statement] * 1000, 3),
+                    }
+                    for statement, count in stats.statements.most_common()
+                ]
+            self.store.add(profile)
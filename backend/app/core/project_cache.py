@@ -0,0 +1,77 @@
+# backend/app/core/project_cache.py
+"""
+Кэш hash -> проект в памяти процесса.
+
+Почти каждый эндпоинт проекта начинается с поиска по хэшу, а нужны ему
+только id и флаги доступа. Они меняются редко: хэш - при regenerate-invite,
+флаги - при обновлении, запись пропадает при удалении. Эти операции
+публикуют ключ "project_hash:<hash>" через шину инвалидации, и запись
+удаляется во всех воркерах. TTL ограничивает жизнь записи, если
+уведомление все-таки потерялось.
+"""
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from app.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.metrics import register_cache
+
+
+class ProjectRef(NamedTuple):
+    id: int
+    is_private: bool
+    requires_approval: bool
+    created_by: int
+
+
+class ProjectCache:
+    """LRU с ограниченным размером и временем жизни записи.
+
+    Поколение увеличивается при каждом удалении записи: результат запроса,
+    начатого до инвалидации, в кэш уже не попадет.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        # hash -> (момент устаревания, проект)
+        self._entries: "OrderedDict[str, Tuple[float, ProjectRef]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, project_hash: str) -> Optional[ProjectRef]:
+        entry = self._entries.get(project_hash)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[project_hash]
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(project_hash)
+        return entry[1]
+
+    def put(self, project_hash: str, ref: ProjectRef, generation: int):
+        if generation != self.generation or self.max_size <= 0:
+            return
+        self._entries[project_hash] = (time.monotonic() + self.ttl, ref)
+        self._entries.move_to_end(project_hash)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def evict(self, project_hash: Optional[str] = None):
+        """Удаляет запись по хэшу; без хэша - очищает кэш целиком"""
+        self.generation += 1
+        if project_hash is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(project_hash, None)
+
+
+project_cache = ProjectCache(settings.PROJECT_CACHE_SIZE, settings.PROJECT_CACHE_TTL_SECONDS)
+invalidation_bus.subscribe("project_hash", project_cache.evict)
+register_cache("project_hash", project_cache)
@@ -0,0 +1,132 @@
+# backend/app/core/query_counter.py
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_PARAM_LIST = re.compile(r"\((?:\s*(?:\$\d+|%\(\w+\)s|%s|\?)\s*,?)+\)")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Приводит SQL к шаблону: параметры, числа и списки IN заменяются на ?"""
+    statement = _PARAM_LIST.sub("(?)", statement)
+    statement = _PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """Статистика SQL-запросов в рамках одного HTTP-запроса"""
+
+    def __init__(self, scope: Optional[dict] = None):
+        # ASGI scope запроса: по нему слушатели событий БД узнают маршрут
+        self.scope = scope
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+        self.statement_time = Counter()
+
+    def record(self, statement: str, duration: float):
+        normalized = normalize_statement(statement)
+        self.count += 1
+        self.total_time += duration
+        self.statements[normalized] += 1
+        self.statement_time[normalized] += duration
+
+    def repeated(self, threshold: int) -> list:
+        """Шаблоны, выполненные больше threshold раз - признак N+1"""
+        return [(sql, count) for sql, count in self.statements.most_common() if count > threshold]
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(scope: Optional[dict] = None):
+    """Считает запросы, выполненные внутри блока (в том числе в дочерних задачах)"""
+    stats = QueryStats(scope)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Контекст живет ровно одно выполнение, в том числе неудачное
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+def install_query_counter(engine):
+    """Подписывается на события движка; AsyncEngine передается как есть"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryCounterMiddleware:
+    """ASGI-middleware: считает SQL-запросы и время БД на каждый HTTP-запрос.
+
+    В режиме отладки добавляет заголовки X-DB-Queries и X-DB-Time (мс).
+    Если один и тот же нормализованный запрос повторяется больше
+    repeat_threshold раз, пишет предупреждение о возможном N+1.
+    """
+
+    def __init__(self, app, expose_headers: bool = False, repeat_threshold: int = 5):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(scope) as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append((b"x-db-time", f"{stats.total_time * 1000:.1f}".encode()))
+                    message["headers"] = headers
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats):
+        repeated = stats.repeated(self.repeat_threshold)
+        if not repeated:
+            return
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path")
+        for sql, count in repeated:
+            logger.warning(
+                f"Possible N+1 in {scope.get('method')} {path}: statement repeated {count} times "
+                f"({stats.count} queries total): {sql[:300]}"
+            )
@@ -4,6 +4,7 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..config import settings
+import hmac
 import logging
 
 logger = logging.getLogger(__name__)
@@ -48,3 +49,9 @@ def verify_token(token: str):
     except Exception as e:
         logger.error(f"Unexpected error verifying token: {str(e)}")
         return None
+
+def verify_admin_key(key: Optional[str]) -> bool:
+    """Проверка ключа администратора; без ADMIN_API_KEY административный доступ выключен"""
+    if not settings.ADMIN_API_KEY or not key:
+        return False
+    return hmac.compare_digest(key, settings.ADMIN_API_KEY)
@@ -0,0 +1,227 @@
+# backend/app/core/slow_queries.py
+"""
+Журнал медленных SQL-запросов.
+
+Каждый запрос дольше SLOW_QUERY_THRESHOLD_MS попадает в кольцевой буфер:
+нормализованный текст, форма параметров (типы без значений), маршрут,
+из которого он выполнен, и длительность. Для доли медленных SELECT
+в фоне снимается EXPLAIN (ANALYZE, BUFFERS) с теми же параметрами на
+отдельном соединении - план показывает, какого индекса не хватает.
+
+EXPLAIN ANALYZE выполняет запрос повторно, поэтому одновременно идет
+не больше одного EXPLAIN, каждый шаблон разбирается не чаще раза
+в EXPLAIN_COOLDOWN секунд, а время ограничено statement_timeout.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.core.query_counter import current_stats, normalize_statement
+
+logger = logging.getLogger(__name__)
+
+# Повторный EXPLAIN одного шаблона не раньше чем через столько секунд
+EXPLAIN_COOLDOWN = 300
+# Сколько шаблонов запоминать для паузы между EXPLAIN
+MAX_EXPLAINED_STATEMENTS = 1000
+
+
+def _value_shape(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameters_shape(parameters, executemany: bool = False):
+    """Типы параметров без значений: в журнал не попадают пользовательские данные"""
+    if executemany:
+        rows = list(parameters or ())
+        return {"executemany": len(rows), "row": parameters_shape(rows[0]) if rows else []}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    return [_value_shape(value) for value in parameters or ()]
+
+
+def _request_route(scope: Optional[dict]) -> Optional[str]:
+    if scope is None:
+        return None
+    route = getattr(scope.get("route"), "path", None) or scope.get("path")
+    return f"{scope.get('method')} {route}"
+
+
+class SlowQueryLog:
+    """Кольцевой буфер медленных запросов с фоновым EXPLAIN для выборки из них"""
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        max_entries: int,
+        explain_sample_rate: float,
+        explain_timeout_ms: int
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self.engine = None
+        self.total = 0
+        self.explains_in_flight = 0
+        self._entries: Deque[dict] = deque(maxlen=max_entries)
+        self._ids = itertools.count(1)
+        self._explained_at: Dict[str, float] = {}
+        self._tasks = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def record(self, statement: str, parameters, executemany: bool, duration: float) -> dict:
+        stats = current_stats()
+        entry = {
+            "id": next(self._ids),
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": _request_route(stats.scope if stats is not None else None),
+            "statement": normalize_statement(statement),
+            "parameters": parameters_shape(parameters, executemany),
+            "duration_ms": round(duration * 1000, 2),
+            "explain": None,
+        }
+        self.total += 1
+        self._entries.append(entry)
+        logger.warning(
+            f"Slow query {entry['duration_ms']}ms in {entry['route'] or 'background'}: "
+            f"{entry['statement'][:300]}"
+        )
+        if not executemany and self._should_explain(statement, entry["statement"]):
+            self._schedule_explain(entry, statement, parameters)
+        return entry
+
+    def _should_explain(self, statement: str, normalized: str) -> bool:
+        # ANALYZE выполняет запрос, поэтому только чтение
+        if self.engine is None or not statement.lstrip()[:6].upper() == "SELECT":
+            return False
+        if self.explains_in_flight or random.random() >= self.explain_sample_rate:
+            return False
+        last = self._explained_at.get(normalized)
+        return last is None or time.monotonic() - last >= EXPLAIN_COOLDOWN
+
+    def _schedule_explain(self, entry: dict, statement: str, parameters):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._mark_explained(entry["statement"])
+        self.explains_in_flight += 1
+        entry["explain"] = {"status": "pending"}
+        # Пустой контекст: EXPLAIN не должен попасть в статистику запроса, который его вызвал
+        task = loop.create_task(
+            self._explain(entry, statement, tuple(parameters or ())),
+            context=contextvars.Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _mark_explained(self, normalized: str):
+        now = time.monotonic()
+        # Переставляем в конец: порядок словаря - порядок последних EXPLAIN
+        self._explained_at.pop(normalized, None)
+        self._explained_at[normalized] = now
+        if len(self._explained_at) > MAX_EXPLAINED_STATEMENTS:
+            # Отметки старше паузы ничего не ограничивают; если их не хватило - забываем самые старые
+            self._explained_at = {
+                key: at for key, at in self._explained_at.items() if now - at < EXPLAIN_COOLDOWN
+            }
+            while len(self._explained_at) > MAX_EXPLAINED_STATEMENTS:
+                del self._explained_at[next(iter(self._explained_at))]
+
+    async def _explain(self, entry: dict, statement: str, parameters: tuple):
+        try:
+            async with self.engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                # Напрямую через asyncpg, минуя события SQLAlchemy
+                driver = raw.driver_connection
+                async with driver.transaction():
+                    await driver.execute(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    rows = await driver.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", *parameters)
+            entry["explain"] = {"status": "done", "plan": "\n".join(row[0] for row in rows)}
+        except Exception as e:
+            logger.warning(f"EXPLAIN failed for slow query {entry['id']}: {e}")
+            entry["explain"] = {"status": "failed", "error": str(e)}
+        finally:
+            self.explains_in_flight -= 1
+
+    def list(self, limit: int = 100) -> List[dict]:
+        return list(itertools.islice(reversed(self._entries), limit))
+
+    def get(self, entry_id: int) -> Optional[dict]:
+        return next((entry for entry in self._entries if entry["id"] == entry_id), None)
+
+    def summary(self, limit: int = 50) -> List[dict]:
+        """Группировка по шаблону: какие запросы медленные чаще всего и их последний план"""
+        groups: Dict[str, dict] = {}
+        for entry in self._entries:
+            group = groups.setdefault(entry["statement"], {
+                "statement": entry["statement"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": set(),
+                "plan": None,
+            })
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            if entry["route"]:
+                group["routes"].add(entry["route"])
+            if entry["explain"] and entry["explain"].get("plan"):
+                group["plan"] = entry["explain"]["plan"]
+
+        result = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)[:limit]
+        for group in result:
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["routes"] = sorted(group["routes"])
+        return result
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_entries=settings.SLOW_QUERY_LOG_SIZE,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время старта храним в контексте выполнения: при ошибке after_cursor_execute
+    # не вызывается, и запись в conn.info осталась бы висеть
+    context._slow_query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_slow_query_started_at", None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    if duration >= slow_query_log.threshold:
+        slow_query_log.record(statement, parameters, executemany, duration)
+
+
+def install_slow_query_log(engine):
+    """Подписывается на события движка; при SLOW_QUERY_THRESHOLD_MS <= 0 журнал выключен"""
+    if not slow_query_log.enabled:
+        return
+    slow_query_log.engine = engine
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,13 +1,164 @@
 # backend/app/database.py
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import Dict, Optional
+import asyncpg
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .core.invalidation import invalidation_bus
+from .core.security import verify_token
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Методы, которые не меняют данные: после них отметка о записи не ставится
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # Кэш подготовленных запросов на соединение; 0 - для PgBouncer в режиме transaction
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "timeout": settings.DB_CONNECT_TIMEOUT,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        },
+    )
+
+engine = _create_engine(DATABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-async def get_db():
+# Реплики только для чтения; без DATABASE_REPLICA_URLS все идет в основную БД
+replica_engines = [_create_engine(url) for url in settings.replica_urls]
+_replica_sessions = itertools.cycle([
+    sessionmaker(replica, class_=AsyncSession, expire_on_commit=False) for replica in replica_engines
+])
+
+class ReadYourWrites:
+    """Кто недавно писал в БД: его чтения идут в основную БД, пока реплики догоняют"""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._writes: Dict[str, float] = {}
+
+    def mark(self, principal: Optional[str]):
+        if not principal:
+            return
+        now = time.monotonic()
+        self._writes[principal] = now
+        if len(self._writes) > 10000:
+            self._writes = {key: at for key, at in self._writes.items() if now - at < self.window}
+
+    def recent(self, principal: Optional[str]) -> bool:
+        at = self._writes.get(principal) if principal else None
+        return at is not None and time.monotonic() - at < self.window
+
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
+# Отметки о записи из других воркеров
+invalidation_bus.subscribe("writer", read_your_writes.mark)
+
+# Сколько сессий для чтения ушло на реплику и сколько осталось на основной БД
+read_routing = Counter()
+
+def read_only(endpoint):
+    """Помечает эндпоинт, который только читает: при наличии реплик его сессия открывается на реплике"""
+    endpoint.read_only = True
+    return endpoint
+
+def read_session(principal: Optional[str] = None) -> AsyncSession:
+    """Сессия для чтения: реплика по кругу, либо основная БД сразу после записи этого пользователя"""
+    if not replica_engines or read_your_writes.recent(principal):
+        read_routing["primary"] += 1
+        return AsyncSessionLocal()
+    read_routing["replica"] += 1
+    return next(_replica_sessions)()
+
+def request_principal(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    return verify_token(authorization.replace("Bearer ", ""))
+
+async def get_db(request: Request):
+    endpoint = getattr(request.scope.get("route"), "endpoint", None)
+    if replica_engines and getattr(endpoint, "read_only", False):
+        async with read_session(request_principal(request)) as session:
+            yield session
+        return
+
+    # Отметка ставится до записи, чтобы следующий запрос клиента точно попал в основную БД;
+    # остальные воркеры получат ее через LISTEN/NOTIFY после коммита
+    principal = None
+    if replica_engines and request.method not in SAFE_METHODS:
+        principal = request_principal(request)
+        read_your_writes.mark(principal)
     async with AsyncSessionLocal() as session:
+        if principal:
+            await invalidation_bus.publish(session, f"writer:{principal}")
         yield session
+
+async def warm_up_pool(connections: int) -> int:
+    """Открывает соединения заранее, чтобы первые запросы не ждали подключения к БД"""
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return 0
+    warmed = 0
+    for target in [engine] + replica_engines:
+        opened = await asyncio.gather(*(target.connect() for _ in range(connections)))
+        # Закрытые соединения возвращаются в пул и остаются открытыми
+        await asyncio.gather(*(conn.close() for conn in opened))
+        warmed += len(opened)
+    return warmed
+
+def pool_status(target=None) -> dict:
+    pool = (target or engine).sync_engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "timeout": pool.timeout(),
+    }
+
+def pool_saturated(target=None) -> bool:
+    status = pool_status(target)
+    return status["checked_out"] >= status["size"] + status["max_overflow"]
+
+async def _probe_pool(target):
+    async with target.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+
+async def _probe_direct(target, timeout: float):
+    """SELECT 1 через отдельное соединение asyncpg, минуя пул"""
+    dsn = target.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    conn = await asyncpg.connect(dsn, timeout=timeout)
+    try:
+        await conn.fetchval("SELECT 1", timeout=timeout)
+    finally:
+        await conn.close(timeout=timeout)
+
+async def check_database(target=None, timeout: float = None) -> float:
+    """Время ответа БД на SELECT 1 в миллисекундах; исключение, если БД недоступна.
+
+    Пока пул исчерпан, свободного соединения пришлось бы ждать DB_POOL_TIMEOUT,
+    и здоровая БД выглядела бы недоступной - тогда проверка идет мимо пула.
+    """
+    target = target or engine
+    timeout = timeout or settings.DB_READINESS_TIMEOUT
+    started = time.perf_counter()
+    if pool_saturated(target):
+        await _probe_direct(target, timeout)
+    else:
+        await asyncio.wait_for(_probe_pool(target), timeout)
+    return (time.perf_counter() - started) * 1000
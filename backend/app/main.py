@@ -1,13 +1,27 @@
 # backend/app/main.py
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.api.auth import router as auth_router
 from app.api.users import router as users_router
 from app.api.projects import router as projects_router
 from app.api.tasks import router as tasks_router
 from app.api.notifications import router as notifications_router
 from app.api.dashboard import router as dashboard_router  # Добавлен новый роутер
+from app.api.join_requests import router as join_requests_router
+from app.api.bot import router as bot_router
+from app.api.admin import router as admin_router
+from app.api.batch import router as batch_router
 from app.models import Base
-from app.database import engine
+from app.database import engine, replica_engines, read_routing, warm_up_pool, pool_status, pool_saturated, check_database
+from app.config import settings
+from app.core.query_counter import QueryCounterMiddleware, install_query_counter
+from app.core.metrics import (
+    MetricsMiddleware, metrics, register_invalidation_bus, register_pool_metrics,
+    register_read_routing, register_slow_query_log
+)
+from app.core.invalidation import invalidation_bus
+from app.core.profiler import ProfilerMiddleware
+from app.core.slow_queries import install_slow_query_log, slow_query_log
 import logging
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -30,8 +44,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time", "X-Profile-Id"],
 )
 
+# Профилирование отдельных запросов администратора; внутри счетчика запросов, чтобы видеть время SQL
+app.add_middleware(ProfilerMiddleware, interval=settings.PROFILER_SAMPLE_INTERVAL_MS / 1000)
+
+# Счетчик SQL-запросов на каждый HTTP-запрос и поиск N+1
+install_query_counter(engine)
+app.add_middleware(
+    QueryCounterMiddleware,
+    expose_headers=settings.DEBUG,
+    repeat_threshold=settings.QUERY_REPEAT_THRESHOLD
+)
+
+# Журнал медленных запросов с EXPLAIN для части из них
+install_slow_query_log(engine)
+
+# Метрики Prometheus: добавляется последним, чтобы учитывать время всех остальных middleware
+register_pool_metrics(engine, settings.DB_MAX_OVERFLOW)
+register_slow_query_log(slow_query_log)
+register_read_routing(read_routing)
+register_invalidation_bus(invalidation_bus)
+app.add_middleware(MetricsMiddleware)
+
 # Инициализация БД
 @app.on_event("startup")
 async def startup():
@@ -40,16 +76,54 @@ async def startup():
         async with engine.begin() as conn:
             logger.info("Creating database tables...")
             await conn.run_sync(Base.metadata.create_all)
+            # Индексы для уже существующих таблиц строит python -m app.migrate
             logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
 
+    warmed = await warm_up_pool(settings.DB_POOL_WARMUP)
+    logger.info(f"Database pool warmed up: {warmed} connections")
+
+    # Отдельное соединение для LISTEN: сброс кэшей после записей в других воркерах.
+    # Идет напрямую в Postgres - через PgBouncer (transaction) уведомления не доходят
+    await invalidation_bus.start(settings.DATABASE_LISTEN_URL or settings.DATABASE_URL)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await invalidation_bus.stop()
+
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "service": "MAX Project Pilot Backend", "version": "1.0.0"}
 
+# Готовность к приему трафика: БД отвечает, в пуле есть свободные соединения
+@app.get("/health/ready")
+async def readiness_check():
+    targets = [("primary", engine)] + [(f"replica_{i}", replica) for i, replica in enumerate(replica_engines, 1)]
+    databases = {}
+    available = True
+    saturated = False
+    for name, target in targets:
+        pool = pool_status(target)
+        saturated = saturated or pool_saturated(target)
+        try:
+            databases[name] = {"latency_ms": round(await check_database(target), 2), "pool": pool}
+        except Exception as e:
+            logger.error(f"Readiness check failed for {name}: {e}")
+            databases[name] = {"error": str(e), "pool": pool}
+            available = False
+
+    if not available:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "databases": databases})
+    return {"status": "saturated" if saturated else "ok", "databases": databases}
+
+# Метрики в формате Prometheus
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # API Health check
 @app.get("/api/health")
 async def api_health_check():
@@ -62,6 +136,10 @@ app.include_router(projects_router, prefix="/api")
 app.include_router(tasks_router, prefix="/api")
 app.include_router(notifications_router, prefix="/api")
 app.include_router(dashboard_router, prefix="/api")  # Добавлен новый роутер
+app.include_router(join_requests_router, prefix="/api")
+app.include_router(bot_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
 
 # Root endpoint
 @app.get("/")
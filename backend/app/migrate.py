@@ -0,0 +1,83 @@
+# backend/app/migrate.py
+"""
+Схема БД: таблицы и недостающие индексы. Запускается один раз перед стартом воркеров:
+
+    python -m app.migrate
+
+create_all создает индексы только вместе с новой таблицей. Индексы, добавленные
+в модели позже, строятся через CREATE INDEX CONCURRENTLY IF NOT EXISTS: запись
+в таблицу не блокируется на время построения, а повторный запуск ничего не
+делает. Прерванное построение оставляет невалидный индекс - такие индексы
+удаляются и строятся заново.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateIndex
+
+from app.config import settings
+from app.models import Base
+
+logger = logging.getLogger(__name__)
+
+_INVALID_INDEXES = text("""
+    SELECT index_class.relname
+    FROM pg_index
+    JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+    WHERE NOT pg_index.indisvalid AND index_class.relname = ANY(:names)
+""")
+
+
+def _model_indexes():
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+
+def _create_index_concurrently(index, dialect) -> str:
+    options = index.dialect_options["postgresql"]
+    options["concurrently"] = True
+    try:
+        return str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    finally:
+        # Модели общие для всего процесса: create_all внутри транзакции не должен получить CONCURRENTLY
+        options["concurrently"] = False
+
+
+async def create_missing_indexes(engine):
+    """Строит индексы моделей, которых еще нет в БД"""
+    indexes = _model_indexes()
+    # CONCURRENTLY нельзя выполнять внутри транзакции
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        invalid = (await conn.execute(_INVALID_INDEXES, {"names": [index.name for index in indexes]})).scalars().all()
+        for name in invalid:
+            logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+            await conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+        for index in indexes:
+            started = time.perf_counter()
+            await conn.exec_driver_sql(_create_index_concurrently(index, conn.dialect))
+            logger.debug(f"Index {index.name} ensured in {time.perf_counter() - started:.2f}s")
+
+
+async def migrate(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await create_missing_indexes(engine)
+
+
+async def main():
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        started = time.perf_counter()
+        await migrate(engine)
+        logger.info(f"Database schema is up to date ({time.perf_counter() - started:.1f}s)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,5 +1,5 @@
 # backend/app/models/project.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -33,7 +33,10 @@ class ProjectMember(Base):
     role = Column(String, default=ProjectRole.MEMBER)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    __table_args__ = (UniqueConstraint('project_id', 'user_id', name='unique_project_user'),)
+    __table_args__ = (
+        UniqueConstraint('project_id', 'user_id', name='unique_project_user'),
+        Index('ix_project_members_user_role', 'user_id', 'role', 'project_id'),
+    )
 
     member_project = relationship("Project", back_populates="members")
     member_user = relationship("User", back_populates="project_memberships")
@@ -49,5 +52,9 @@ class JoinRequest(Base):
     processed_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     processed_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        Index('ix_join_requests_pending', 'project_id', 'id', postgresql_where=text("status = 'pending'")),
+    )
+
     join_request_project = relationship("Project", back_populates="join_requests")
     join_request_user = relationship("User", foreign_keys=[user_id], back_populates="join_requests")
@@ -1,5 +1,5 @@
 # backend/app/models/task.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -22,6 +22,22 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Списки задач проекта в порядке создания и keyset-пагинация по (created_at, id)
+        Index('ix_tasks_project_created', 'project_id', 'created_at', 'id'),
+        # Фасеты /tasks/query считаются по индексу без чтения таблицы
+        Index('ix_tasks_project_facets', 'project_id', 'status', 'priority', 'assigned_to_id'),
+        # Доска проекта: колонки по статусу в порядке создания, новые сверху
+        Index('ix_tasks_project_board', project_id, status, created_at.desc(), id.desc()),
+        # Календарь: задачи проекта в диапазоне сроков; задачи без срока в индекс не попадают
+        Index('ix_tasks_project_due', 'project_id', 'due_date', postgresql_where=text("due_date IS NOT NULL")),
+        # Дерево подзадач: рекурсивный обход по parent_task_id
+        Index('ix_tasks_parent', 'parent_task_id', postgresql_where=text("parent_task_id IS NOT NULL")),
+        # Личные списки незавершенных задач: размер зависит от задач пользователя, а не проектов
+        Index('ix_tasks_assignee_open', 'assigned_to_id', 'due_date', postgresql_where=text("status <> 'done'")),
+        Index('ix_tasks_creator_open', 'created_by', 'due_date', postgresql_where=text("status <> 'done'")),
+    )
+
     # Relationships
     task_project = relationship("Project", back_populates="tasks")
     task_creator = relationship("User", foreign_keys=[created_by], back_populates="created_tasks")
@@ -74,5 +90,10 @@ class Comment(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Число комментариев и последний комментарий задачи без чтения таблицы целиком
+        Index('ix_comments_task_created', 'task_id', 'created_at'),
+    )
+
     comment_task = relationship("Task", back_populates="comments")
     comment_user = relationship("User", foreign_keys=[user_id], back_populates="comments")
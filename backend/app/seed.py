@@ -0,0 +1,424 @@
+# backend/app/seed.py
+"""
+Генератор синтетических данных для нагрузочного тестирования.
+
+Загружает N пользователей, M проектов и K задач через COPY (asyncpg),
+поэтому датасет на миллион задач грузится за минуты. Результат
+детерминирован при одинаковом --seed на пустой базе.
+
+Пример:
+    python -m app.seed --users 10000 --projects 2000 --tasks 1000000 \
+        --members-per-project zipf:1.5:50 --comments-per-task poisson:2 --seed 42
+
+Распределения задаются строкой:
+    const:N, uniform:A:B, poisson:L, normal:MU:SIGMA, zipf:S:MAX
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import logging
+import math
+import random
+import string
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.migrate import migrate
+from app.models import (
+    User, UserSettings, Project, ProjectMember, JoinRequest,
+    Task, TaskDependency, Comment, Notification,
+    ProjectRole, TaskStatus, TaskPriority, NotificationType
+)
+
+logger = logging.getLogger(__name__)
+
+SEED_TABLES = [
+    User, UserSettings, Project, ProjectMember, JoinRequest,
+    Task, TaskDependency, Comment, Notification
+]
+
+TIMEZONES = ["UTC", "Europe/Moscow", "Europe/Berlin", "Asia/Yekaterinburg", "Asia/Novosibirsk", "America/New_York"]
+WORDS = [
+    "отчет", "дизайн", "релиз", "бэкенд", "фронтенд", "тесты", "документация", "интеграция",
+    "база", "миграция", "ревью", "баг", "оптимизация", "встреча", "план", "бот", "платежи", "поиск"
+]
+
+
+class Distribution:
+    """Целочисленное неотрицательное распределение, заданное строкой вида 'poisson:3'"""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, *params = spec.split(":")
+        self.kind = kind
+        try:
+            self.params = [float(p) for p in params]
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid distribution parameters: {spec}")
+
+        expected = {"const": 1, "uniform": 2, "poisson": 1, "normal": 2, "zipf": 2}
+        if kind not in expected or len(self.params) != expected[kind]:
+            raise argparse.ArgumentTypeError(
+                f"Invalid distribution '{spec}', expected one of "
+                f"const:N, uniform:A:B, poisson:L, normal:MU:SIGMA, zipf:S:MAX"
+            )
+
+        if kind == "zipf":
+            # Ограниченный Zipf: P(k) ~ 1 / k^s для k = 1..MAX
+            exponent, maximum = self.params
+            weights = [1 / k ** exponent for k in range(1, int(maximum) + 1)]
+            self._cum_weights = list(itertools.accumulate(weights))
+
+    def sample(self, rng: random.Random) -> int:
+        if self.kind == "const":
+            return int(self.params[0])
+        if self.kind == "uniform":
+            return rng.randint(int(self.params[0]), int(self.params[1]))
+        if self.kind == "poisson":
+            return self._poisson(rng, self.params[0])
+        if self.kind == "normal":
+            return max(0, int(round(rng.gauss(*self.params))))
+        # zipf
+        point = rng.random() * self._cum_weights[-1]
+        return bisect.bisect_left(self._cum_weights, point) + 1
+
+    @staticmethod
+    def _poisson(rng: random.Random, lam: float) -> int:
+        if lam <= 0:
+            return 0
+        if lam > 30:
+            return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+        # Алгоритм Кнута
+        limit, k, p = math.exp(-lam), 0, 1.0
+        while True:
+            p *= rng.random()
+            if p <= limit:
+                return k
+            k += 1
+
+    def __repr__(self):
+        return self.spec
+
+
+class Seeder:
+    def __init__(self, conn, args):
+        self.conn = conn
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now(timezone.utc)
+        self.counts = {}
+        self.next_ids = {}
+        # project_id -> [(user_id, role)], user_id -> [project_id]
+        self.project_members = {}
+        self.user_projects = {}
+
+    async def reserve_ids(self):
+        """Явные id позволяют связывать строки без RETURNING; последовательности сдвигаем в конце"""
+        for model in SEED_TABLES:
+            table = model.__table__.name
+            await self.conn.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            max_id = await self.conn.fetchval(f"SELECT coalesce(max(id), 0) FROM {table}")
+            self.next_ids[table] = max_id + 1
+            self.counts[table] = 0
+
+    def take_ids(self, table: str, count: int) -> range:
+        start = self.next_ids[table]
+        self.next_ids[table] += count
+        return range(start, start + count)
+
+    async def copy(self, model, columns, records):
+        if not records:
+            return
+        table = model.__table__.name
+        await self.conn.copy_records_to_table(table, records=records, columns=columns)
+        self.counts[table] += len(records)
+
+    async def sync_sequences(self):
+        for model in SEED_TABLES:
+            table = model.__table__.name
+            await self.conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT coalesce(max(id), 1) FROM {table}))"
+            )
+
+    def random_past(self, max_days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randint(0, max_days * 86400))
+
+    def random_title(self, words: int = 3) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    async def seed_users(self):
+        args = self.args
+        user_ids = self.take_ids("users", args.users)
+        settings_ids = self.take_ids("user_settings", args.users)
+
+        users, user_settings = [], []
+        for user_id, settings_id in zip(user_ids, settings_ids):
+            created_at = self.random_past(365)
+            users.append((
+                user_id, f"{args.prefix}_{user_id}", f"Seed User {user_id}",
+                f"{args.prefix}{user_id}", True, created_at
+            ))
+            user_settings.append((
+                settings_id, user_id, self.rng.choice(["light", "dark", "auto"]), "ru",
+                True, False, True, False, True, "list", self.rng.choice(TIMEZONES),
+                "DD.MM.YYYY", "24h", 20, "{}", created_at
+            ))
+            if len(users) >= args.batch_size:
+                await self._flush_users(users, user_settings)
+                users, user_settings = [], []
+        await self._flush_users(users, user_settings)
+
+        self.user_ids = list(user_ids)
+        for user_id in self.user_ids:
+            self.user_projects[user_id] = []
+
+    async def _flush_users(self, users, user_settings):
+        await self.copy(User, ["id", "max_id", "full_name", "username", "is_active", "created_at"], users)
+        await self.copy(UserSettings, [
+            "id", "user_id", "theme", "language", "notifications_enabled", "email_notifications",
+            "push_notifications", "compact_view", "show_completed_tasks", "default_project_view",
+            "timezone", "date_format", "time_format", "items_per_page", "custom_settings", "created_at"
+        ], user_settings)
+
+    def project_hash(self, project_id: int) -> str:
+        """Префикс из id фиксированной ширины гарантирует уникальность при повторном запуске с тем же seed"""
+        alphabet = string.digits + string.ascii_lowercase
+        prefix = ""
+        while project_id:
+            project_id, digit = divmod(project_id, 36)
+            prefix = alphabet[digit] + prefix
+        prefix = prefix.rjust(5, "0")
+        return prefix + "".join(self.rng.choice(alphabet) for _ in range(12 - len(prefix)))
+
+    async def seed_projects(self):
+        args = self.args
+        project_ids = self.take_ids("projects", args.projects)
+        projects, members, join_requests = [], [], []
+
+        for project_id in project_ids:
+            owner_id = self.rng.choice(self.user_ids)
+            created_at = self.random_past(365)
+            is_private = self.rng.random() < args.private_ratio
+            projects.append((
+                project_id, self.random_title(2), "Сгенерировано app.seed",
+                self.project_hash(project_id), is_private, is_private and self.rng.random() < 0.5,
+                owner_id, created_at
+            ))
+
+            size = min(len(self.user_ids), max(1, args.members_per_project.sample(self.rng)))
+            others = [u for u in self.rng.sample(self.user_ids, size) if u != owner_id][:size - 1]
+            project_members = [(owner_id, ProjectRole.OWNER.value)]
+            for user_id in others:
+                role = self.rng.choices(
+                    [ProjectRole.ADMIN.value, ProjectRole.MEMBER.value, ProjectRole.GUEST.value],
+                    weights=[1, 8, 1]
+                )[0]
+                project_members.append((user_id, role))
+
+            self.project_members[project_id] = project_members
+            for user_id, role in project_members:
+                self.user_projects[user_id].append(project_id)
+                members.append((self.take_ids("project_members", 1)[0], project_id, user_id, role, created_at))
+
+            # Ожидающие заявки от пользователей вне проекта
+            member_ids = {user_id for user_id, _ in project_members}
+            for _ in range(args.join_requests_per_project.sample(self.rng)):
+                candidate = self.rng.choice(self.user_ids)
+                if candidate in member_ids:
+                    continue
+                member_ids.add(candidate)
+                join_requests.append((
+                    self.take_ids("join_requests", 1)[0], project_id, candidate, "pending", self.random_past(30)
+                ))
+
+            if len(members) >= args.batch_size:
+                await self._flush_projects(projects, members, join_requests)
+                projects, members, join_requests = [], [], []
+        await self._flush_projects(projects, members, join_requests)
+
+        self.project_ids = list(project_ids)
+
+    async def _flush_projects(self, projects, members, join_requests):
+        await self.copy(Project, [
+            "id", "title", "description", "hash", "is_private", "requires_approval", "created_by", "created_at"
+        ], projects)
+        await self.copy(ProjectMember, ["id", "project_id", "user_id", "role", "joined_at"], members)
+        await self.copy(JoinRequest, ["id", "project_id", "user_id", "status", "requested_at"], join_requests)
+
+    def allocate_tasks(self) -> list:
+        """Делит K задач между проектами пропорционально весам из --tasks-per-project"""
+        args = self.args
+        weights = [max(0, args.tasks_per_project.sample(self.rng)) for _ in self.project_ids]
+        total_weight = sum(weights) or len(weights)
+        if not sum(weights):
+            weights = [1] * len(weights)
+
+        shares = [args.tasks * w / total_weight for w in weights]
+        allocation = [int(share) for share in shares]
+        # Остаток раздаем проектам с наибольшей дробной частью
+        remainder = args.tasks - sum(allocation)
+        by_fraction = sorted(range(len(shares)), key=lambda i: shares[i] - allocation[i], reverse=True)
+        for i in by_fraction[:remainder]:
+            allocation[i] += 1
+        return allocation
+
+    async def seed_tasks(self):
+        args = self.args
+        statuses = [TaskStatus.TODO.value, TaskStatus.IN_PROGRESS.value, TaskStatus.DONE.value]
+        priorities = [p.value for p in TaskPriority]
+        tasks, dependencies, comments = [], [], []
+
+        for project_id, task_count in zip(self.project_ids, self.allocate_tasks()):
+            if not task_count:
+                continue
+            members = [user_id for user_id, _ in self.project_members[project_id]]
+            task_ids = list(self.take_ids("tasks", task_count))
+
+            chain_left = 0
+            for position, task_id in enumerate(task_ids):
+                created_at = self.random_past(180)
+                due_date = None
+                if self.rng.random() < args.due_date_ratio:
+                    due_date = self.now + timedelta(days=self.rng.randint(-30, 60), hours=self.rng.randint(0, 23))
+
+                parent_id = None
+                if position and self.rng.random() < args.subtask_ratio:
+                    parent_id = task_ids[self.rng.randrange(position)]
+
+                tasks.append((
+                    task_id, self.random_title(), "", self.rng.choices(statuses, weights=[4, 2.5, 3.5])[0],
+                    self.rng.choice(priorities), project_id, self.rng.choice(members),
+                    self.rng.choice(members) if self.rng.random() < args.assigned_ratio else None,
+                    due_date, parent_id, True, created_at
+                ))
+
+                # Цепочки зависимостей: каждая следующая задача цепочки зависит от предыдущей
+                if chain_left > 0:
+                    dependencies.append((self.take_ids("task_dependencies", 1)[0], task_id, task_ids[position - 1]))
+                    chain_left -= 1
+                else:
+                    chain_left = max(0, args.dependency_depth.sample(self.rng) - 1)
+
+                for _ in range(args.comments_per_task.sample(self.rng)):
+                    comments.append((
+                        self.take_ids("comments", 1)[0], task_id, self.rng.choice(members),
+                        self.random_title(6),
+                        min(self.now, created_at + timedelta(minutes=self.rng.randint(1, 60 * 24 * 14)))
+                    ))
+
+                if len(tasks) >= args.batch_size:
+                    await self._flush_tasks(tasks, dependencies, comments)
+                    tasks, dependencies, comments = [], [], []
+        await self._flush_tasks(tasks, dependencies, comments)
+
+    async def _flush_tasks(self, tasks, dependencies, comments):
+        if not tasks:
+            return
+        await self.copy(Task, [
+            "id", "title", "description", "status", "priority", "project_id", "created_by",
+            "assigned_to_id", "due_date", "parent_task_id", "is_active", "created_at"
+        ], tasks)
+        await self.copy(TaskDependency, ["id", "task_id", "depends_on_id"], dependencies)
+        await self.copy(Comment, ["id", "task_id", "user_id", "content", "created_at"], comments)
+        logger.info(f"Loaded {self.counts['tasks']} tasks, {self.counts['comments']} comments")
+
+    async def seed_notifications(self):
+        args = self.args
+        types = [t.value for t in NotificationType]
+        notifications = []
+
+        for user_id in self.user_ids:
+            projects = self.user_projects[user_id]
+            for _ in range(args.notifications_per_user.sample(self.rng)):
+                notification_type = self.rng.choice(types)
+                notifications.append((
+                    self.take_ids("notifications", 1)[0], user_id,
+                    self.rng.choice(projects) if projects else None,
+                    notification_type, self.random_title(2), self.random_title(8),
+                    self.rng.random() > args.unread_ratio, self.random_past(60)
+                ))
+            if len(notifications) >= args.batch_size:
+                await self._flush_notifications(notifications)
+                notifications = []
+        await self._flush_notifications(notifications)
+
+    async def _flush_notifications(self, notifications):
+        await self.copy(Notification, [
+            "id", "user_id", "project_id", "type", "title", "message", "is_read", "created_at"
+        ], notifications)
+
+    async def run(self):
+        await self.reserve_ids()
+        for step in (self.seed_users, self.seed_projects, self.seed_tasks, self.seed_notifications):
+            started = time.perf_counter()
+            await step()
+            logger.info(f"{step.__name__} finished in {time.perf_counter() - started:.1f}s")
+        await self.sync_sequences()
+        return self.counts
+
+
+async def seed(args):
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        await migrate(engine)
+        if args.reset:
+            async with engine.begin() as conn:
+                tables = ", ".join(model.__table__.name for model in SEED_TABLES)
+                await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver_conn = raw.driver_connection
+            # Все данные грузятся одной транзакцией: при ошибке база остается как была
+            async with driver_conn.transaction():
+                counts = await Seeder(driver_conn, args).run()
+            for model in SEED_TABLES:
+                await driver_conn.execute(f"ANALYZE {model.__table__.name}")
+
+        logger.info(f"Seeding finished in {time.perf_counter() - started:.1f}s: {counts}")
+        return counts
+    finally:
+        await engine.dispose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic dataset generator for MAX Project Pilot")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=20000, help="Total number of tasks")
+    parser.add_argument("--members-per-project", type=Distribution, default=Distribution("zipf:1.5:50"))
+    parser.add_argument("--tasks-per-project", type=Distribution, default=Distribution("zipf:1.2:500"),
+                        help="Relative weight of a project when splitting --tasks")
+    parser.add_argument("--dependency-depth", type=Distribution, default=Distribution("poisson:1"),
+                        help="Length of dependency chains inside a project")
+    parser.add_argument("--comments-per-task", type=Distribution, default=Distribution("poisson:1.5"))
+    parser.add_argument("--notifications-per-user", type=Distribution, default=Distribution("poisson:10"))
+    parser.add_argument("--join-requests-per-project", type=Distribution, default=Distribution("poisson:0.5"))
+    parser.add_argument("--subtask-ratio", type=float, default=0.1)
+    parser.add_argument("--assigned-ratio", type=float, default=0.7)
+    parser.add_argument("--due-date-ratio", type=float, default=0.6)
+    parser.add_argument("--private-ratio", type=float, default=0.7)
+    parser.add_argument("--unread-ratio", type=float, default=0.3)
+    parser.add_argument("--prefix", default="seed", help="Prefix of generated max_id values")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per COPY batch")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="TRUNCATE all application tables first")
+    args = parser.parse_args(argv)
+
+    if args.users < 1 or args.projects < 0 or args.tasks < 0:
+        parser.error("--users must be positive, --projects and --tasks non-negative")
+    if args.tasks and not args.projects:
+        parser.error("--tasks requires at least one project")
+    return args
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(seed(parse_args()))
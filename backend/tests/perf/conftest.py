@@ -0,0 +1,114 @@
+# backend/tests/perf/conftest.py
+"""
+Фикстуры тестов производительности.
+
+Тесты запускают приложение в том же процессе (httpx.ASGITransport) против
+отдельной базы, которую заполняет app.seed. База очищается перед каждым
+набором данных, поэтому адрес передается только через TEST_DATABASE_URL:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost:5432/pilot_test pytest tests/perf
+"""
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # Настройки приложения читаются при импорте, поэтому окружение готовим до него
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ["DEBUG"] = "true"
+    os.environ.setdefault("SECRET_KEY", "perf-test-secret")
+    os.environ.setdefault("SITE_URL", "http://localhost")
+    os.environ.setdefault("BACKEND_API_URL", "http://localhost/api")
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        if "perf" in item.nodeid:
+            item.add_marker(skip)
+
+
+@dataclass
+class Dataset:
+    name: str
+    users: int
+    projects: int
+    tasks: int
+    # Во скольких проектах состоит пользователь, от имени которого идут запросы
+    user_projects: int
+
+
+DATASETS = [
+    Dataset("small", users=50, projects=20, tasks=2000, user_projects=3),
+    Dataset("large", users=300, projects=200, tasks=20000, user_projects=40),
+]
+
+
+@dataclass
+class SeededDataset:
+    dataset: Dataset
+    max_id: str
+    project_hash: str
+    headers: dict
+
+
+async def _seed(dataset: Dataset) -> SeededDataset:
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.models import User, UserSettings, Project, ProjectMember, ProjectRole
+    from app.core.security import create_access_token
+    from app.seed import seed, parse_args
+
+    await seed(parse_args([
+        "--users", str(dataset.users),
+        "--projects", str(dataset.projects),
+        "--tasks", str(dataset.tasks),
+        "--private-ratio", "0.5",
+        "--seed", "1",
+        "--reset",
+    ]))
+
+    # Отдельный пользователь с заранее известным числом проектов
+    async with AsyncSessionLocal() as db:
+        user = User(max_id="perf_user", full_name="Perf User", username="perf")
+        db.add(user)
+        await db.flush()
+        db.add(UserSettings(user_id=user.id))
+
+        projects = (await db.execute(
+            select(Project).order_by(Project.id).limit(dataset.user_projects)
+        )).scalars().all()
+        roles = [ProjectRole.ADMIN, ProjectRole.MEMBER, ProjectRole.GUEST]
+        for i, project in enumerate(projects):
+            db.add(ProjectMember(project_id=project.id, user_id=user.id, role=roles[i % len(roles)]))
+        await db.commit()
+
+    token = create_access_token({"sub": "perf_user"}, expires_delta=timedelta(hours=1))
+    return SeededDataset(
+        dataset=dataset,
+        max_id="perf_user",
+        project_hash=projects[0].hash,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+@pytest.fixture(scope="module", params=DATASETS, ids=[d.name for d in DATASETS])
+async def seeded(request):
+    return await _seed(request.param)
+
+
+@pytest.fixture(scope="session")
+async def client():
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://perf") as http_client:
+            yield http_client
@@ -0,0 +1,31 @@
+# backend/tests/perf/test_auth.py
+"""Вход пользователя: одновременные первые входы с одним max_id"""
+import asyncio
+import uuid
+
+
+async def test_concurrent_first_logins_share_one_user(client, seeded):
+    max_id = f"race-{uuid.uuid4().hex[:8]}"
+    responses = await asyncio.gather(*[
+        client.post("/api/auth/token", json={"max_id": max_id, "full_name": "Race"})
+        for _ in range(8)
+    ])
+
+    assert [response.status_code for response in responses] == [200] * 8
+    assert len({response.json()["user"]["id"] for response in responses}) == 1
+
+
+async def test_login_without_profile_keeps_stored_name(client, seeded):
+    max_id = f"profile-{uuid.uuid4().hex[:8]}"
+    response = await client.post("/api/auth/token", json={"max_id": max_id, "full_name": "Real Name", "username": "real"})
+    assert response.status_code == 200, response.text
+
+    # Бот без сервисного ключа не знает имени и не передает его
+    response = await client.post("/api/auth/token", json={"max_id": max_id})
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["full_name"] == "Real Name"
+    assert response.json()["user"]["username"] == "real"
+
+    response = await client.post("/api/auth/token", json={"max_id": max_id, "full_name": "New Name"})
+    assert response.json()["user"]["full_name"] == "New Name"
+    assert response.json()["user"]["username"] == "real"
@@ -0,0 +1,41 @@
+# backend/tests/perf/test_batch.py
+"""Пакетные запросы: статус и тело каждого подзапроса отдельно"""
+
+
+async def test_batch_reports_validation_errors_per_item(client, seeded):
+    response = await client.post("/api/batch", headers=seeded.headers, json={"requests": [
+        {"id": "ok", "path": "/tasks/mine"},
+        {"id": "bad_limit", "path": "/tasks/query?limit=abc"},
+        {"id": "bad_scope", "path": "/tasks/mine?scope=bogus"},
+        {"id": "missing", "path": "/no-such-route"},
+    ]})
+    assert response.status_code == 200, response.text
+    items = {item["id"]: item for item in response.json()["responses"]}
+
+    assert items["ok"]["status"] == 200
+    assert items["bad_limit"]["status"] == 422
+    assert items["bad_limit"]["body"]["detail"][0]["loc"] == ["query", "limit"]
+    assert items["bad_scope"]["status"] == 422
+    assert items["missing"]["status"] == 404
+
+
+async def test_batch_sub_requests_read_from_replica(client, seeded, monkeypatch):
+    import itertools
+    from app import database
+
+    # Основная БД в роли реплики: важно только, куда маршрутизируются сессии
+    monkeypatch.setattr(database, "replica_engines", [database.engine])
+    monkeypatch.setattr(database, "_replica_sessions", itertools.cycle([database.AsyncSessionLocal]))
+    database.read_your_writes._writes.pop(seeded.max_id, None)
+    before = dict(database.read_routing)
+
+    response = await client.post("/api/batch", headers=seeded.headers, json={"requests": [
+        {"id": "mine", "path": "/tasks/mine"},
+        {"id": "query", "path": "/tasks/query?limit=5"},
+    ]})
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()["responses"]] == [200, 200]
+
+    assert database.read_routing["primary"] == before.get("primary", 0)
+    assert database.read_routing["replica"] - before.get("replica", 0) == 3
+    assert not database.read_your_writes.recent(seeded.max_id)
@@ -0,0 +1,62 @@
+# backend/tests/perf/test_project_cache.py
+"""Кэш hash -> проект не отдает старый хэш после regenerate-invite"""
+import asyncio
+
+from app.core.invalidation import invalidation_bus
+from app.core.project_cache import project_cache
+
+
+async def _wait_for_listener():
+    for _ in range(50):
+        if invalidation_bus.connected:
+            return
+        await asyncio.sleep(0.1)
+    raise AssertionError("cache invalidation listener did not connect")
+
+
+async def test_regenerated_invite_hash_is_evicted_after_commit(client, seeded):
+    await _wait_for_listener()
+    old_hash = seeded.project_hash
+
+    response = await client.get(f"/api/projects/{old_hash}/members", headers=seeded.headers)
+    assert response.status_code == 200, response.text
+    assert project_cache.get(old_hash) is not None
+
+    response = await client.post(f"/api/projects/{old_hash}/regenerate-invite", headers=seeded.headers)
+    assert response.status_code == 200, response.text
+    seeded.project_hash = response.json()["new_invite_hash"]
+
+    # Сброс в своем воркере - сразу после коммита, без ожидания NOTIFY
+    assert project_cache.get(old_hash) is None
+    response = await client.get(f"/api/projects/{old_hash}/members", headers=seeded.headers)
+    assert response.status_code == 404
+
+
+async def test_cache_is_bypassed_without_listener(client, seeded, monkeypatch):
+    monkeypatch.setattr(invalidation_bus, "connected", False)
+    project_cache.evict()
+
+    response = await client.get(f"/api/projects/{seeded.project_hash}/members", headers=seeded.headers)
+    assert response.status_code == 200, response.text
+    assert project_cache.get(seeded.project_hash) is None
+
+
+async def test_publish_evicts_only_after_commit(client, seeded, monkeypatch):
+    from app.core.project_cache import ProjectRef
+    from app.database import AsyncSessionLocal
+
+    monkeypatch.setattr(invalidation_bus, "connected", False)
+    ref = ProjectRef(id=1, is_private=False, requires_approval=False, created_by=1)
+
+    project_cache.put("stale-hash", ref, project_cache.generation)
+    async with AsyncSessionLocal() as db:
+        await invalidation_bus.publish(db, "project_hash:stale-hash")
+        # Пока запись не закоммичена, параллельное чтение увидит старую строку
+        assert project_cache.get("stale-hash") == ref
+        await db.rollback()
+    assert project_cache.get("stale-hash") == ref
+
+    async with AsyncSessionLocal() as db:
+        await invalidation_bus.publish(db, "project_hash:stale-hash")
+        await db.commit()
+    assert project_cache.get("stale-hash") is None
@@ -0,0 +1,66 @@
+# backend/tests/perf/test_query_budget.py
+"""
+Бюджет SQL-запросов и задержки для ключевых эндпоинтов.
+
+Число запросов не должно зависеть от размера данных: в наборе "large"
+пользователь состоит в большем числе проектов, чем любой бюджет, поэтому
+запрос в цикле по проектам (N+1) сразу выходит за лимит.
+"""
+import os
+import time
+
+import pytest
+
+from tests.perf.conftest import DATASETS
+
+# Эндпоинт -> максимальное число SQL-запросов (включая аутентификацию)
+QUERY_BUDGETS = {
+    "/api/dashboard/": 7,
+    "/api/users/{max_id}/projects": 7,
+    "/api/tasks/": 2,
+    "/api/projects/{project_hash}": 7,
+    "/api/projects/search/public": 4,
+    "/api/users/me/team": 2,
+    "/api/tasks/query?status=todo,in_progress&sort=priority": 3,
+    "/api/tasks/mine": 3,
+    "/api/tasks/mine?include_comments=true": 4,
+    "/api/projects/{project_hash}/board": 4,
+    "/api/tasks/calendar?from=2020-01-01&to=2020-12-31&mode=days": 3,
+}
+
+# Потолок задержки в миллисекундах; на медленных CI-машинах его можно ослабить
+LATENCY_FACTOR = float(os.getenv("PERF_LATENCY_FACTOR", "1"))
+LATENCY_CEILINGS_MS = {"small": 500, "large": 2000}
+
+
+def _url(template: str, seeded) -> str:
+    return template.format(max_id=seeded.max_id, project_hash=seeded.project_hash)
+
+
+def test_budgets_detect_per_project_queries():
+    """Пользователь большого набора состоит в большем числе проектов, чем любой бюджет"""
+    largest = max(DATASETS, key=lambda d: d.user_projects)
+    assert largest.user_projects > max(QUERY_BUDGETS.values())
+
+
+@pytest.mark.parametrize("template", list(QUERY_BUDGETS))
+async def test_query_budget(client, seeded, template):
+    url = _url(template, seeded)
+
+    # Первый запрос прогревает пул соединений и кэш планов
+    warmup = await client.get(url, headers=seeded.headers)
+    assert warmup.status_code == 200, warmup.text
+
+    started = time.perf_counter()
+    response = await client.get(url, headers=seeded.headers)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert response.status_code == 200, response.text
+    queries = int(response.headers["x-db-queries"])
+    assert queries <= QUERY_BUDGETS[template], (
+        f"{template} ran {queries} SQL statements on '{seeded.dataset.name}' dataset, "
+        f"budget is {QUERY_BUDGETS[template]}"
+    )
+
+    ceiling = LATENCY_CEILINGS_MS[seeded.dataset.name] * LATENCY_FACTOR
+    assert elapsed_ms <= ceiling, f"{template} took {elapsed_ms:.0f}ms, ceiling is {ceiling:.0f}ms"
@@ -0,0 +1,23 @@
+# backend/tests/perf/test_readiness.py
+"""Готовность при исчерпанном пуле: БД здорова, ждать свободное соединение не нужно"""
+import asyncio
+import time
+from contextlib import AsyncExitStack
+
+from app.config import settings
+from app.database import engine, pool_status
+
+
+async def test_ready_reports_saturated_pool_without_waiting(client):
+    status = pool_status()
+    async with AsyncExitStack() as stack:
+        free = status["size"] + status["max_overflow"] - status["checked_out"]
+        await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(free)))
+
+        started = time.perf_counter()
+        response = await client.get("/health/ready")
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "saturated"
+    assert elapsed < settings.DB_POOL_TIMEOUT
@@ -1,11 +1,12 @@
 import asyncio
 import logging
-from maxapi import Bot, Dispatcher, F
+from maxapi import Bot, F
 from maxapi.types import MessageCreated, MessageCallback, CallbackButton, OpenAppButton
 from maxapi.utils.inline_keyboard import InlineKeyboardBuilder
 from maxapi.filters.command import Command
 
 from app.config import settings
+from app.dispatcher import ConcurrentDispatcher
 from app.handlers import (
     cmd_start, cmd_help, cmd_create_project, cmd_join_project, cmd_my_projects,
     handle_callback_projects,
@@ -23,7 +24,11 @@ from app.handlers import (
 logging.basicConfig(level=logging.INFO)
 
 bot = Bot(token=settings.BOT_TOKEN)
-dp = Dispatcher()
+dp = ConcurrentDispatcher(
+    max_concurrency=settings.MAX_CONCURRENT_UPDATES,
+    max_queue=settings.MAX_QUEUED_UPDATES,
+    metrics_interval=settings.UPDATE_METRICS_INTERVAL_SECONDS
+)
 
 # Обработчики команд
 @dp.message_created(Command('start'))
@@ -139,7 +144,10 @@ async def handle_unknown_message(event: MessageCreated):
 
 async def main():
     logging.info("Starting MAX Project Pilot Bot...")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await dp.pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -6,6 +6,12 @@ load_dotenv()
 class Settings(BaseSettings):
     BOT_TOKEN: str
     BACKEND_API_URL: str
+    SERVICE_API_KEY: str = ""
+    VIEW_CACHE_TTL_SECONDS: float = 20.0
+    VIEW_CACHE_MAX_ENTRIES: int = 1000
+    MAX_CONCURRENT_UPDATES: int = 16
+    MAX_QUEUED_UPDATES: int = 500
+    UPDATE_METRICS_INTERVAL_SECONDS: float = 60.0
     MAX_MINI_APP_URL: str = "https://max.ru/t44_hakaton_bot"
     SITE_URL: str = "https://vasilkin6666.github.io/max_project_pilot/web"
 
@@ -0,0 +1,188 @@
+# bot/app/dispatcher.py
+import asyncio
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from maxapi import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+# Ошибка обработчика текущего события: базовый Dispatcher.handle логирует ее и не пробрасывает
+_handler_error: ContextVar = ContextVar("handler_error", default=None)
+
+class HandlerMetrics:
+    """Метрики пула: глубина очереди и задержки обработчиков"""
+
+    def __init__(self, window: int = 1000):
+        self.processed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=window)
+        self.queue_waits = deque(maxlen=window)
+
+    def observe(self, wait: float, latency: float, failed: bool):
+        self.processed += 1
+        if failed:
+            self.failed += 1
+        self.queue_waits.append(wait)
+        self.latencies.append(latency)
+
+    @staticmethod
+    def _percentile(values, percent: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self, queue_depth: int, in_flight: int, active_chats: int) -> dict:
+        return {
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": in_flight,
+            "active_chats": active_chats,
+            "processed": self.processed,
+            "failed": self.failed,
+            "handler_p50_ms": round(self._percentile(self.latencies, 50) * 1000, 1),
+            "handler_p95_ms": round(self._percentile(self.latencies, 95) * 1000, 1),
+            "handler_max_ms": round(max(self.latencies, default=0.0) * 1000, 1),
+            "queue_wait_p95_ms": round(self._percentile(self.queue_waits, 95) * 1000, 1),
+        }
+
+class UpdateWorkerPool:
+    """Параллельная обработка обновлений с сохранением порядка внутри одного чата.
+
+    События одного ключа (чат/пользователь) выполняются строго последовательно,
+    разные ключи - параллельно, но не более max_concurrency одновременно.
+    Когда в очереди max_queue событий, submit ждет освобождения места.
+    """
+
+    def __init__(self, handler, max_concurrency: int, max_queue: int, metrics_interval: float = 60.0):
+        self._handler = handler
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_queue = max_queue
+        self._metrics_interval = metrics_interval
+        self._chats = {}
+        self._queued = 0
+        self._in_flight = 0
+        self._not_full = asyncio.Condition()
+        self._tasks = set()
+        self._reporter = None
+        self.metrics = HandlerMetrics()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def snapshot(self) -> dict:
+        return self.metrics.snapshot(self._queued, self._in_flight, len(self._chats))
+
+    async def submit(self, key, event):
+        self._ensure_reporter()
+
+        # Backpressure: не принимаем новые события, пока очередь переполнена
+        async with self._not_full:
+            if self._queued >= self._max_queue:
+                logger.warning(f"Update queue is full ({self._queued}), waiting for workers")
+            await self._not_full.wait_for(lambda: self._queued < self._max_queue)
+            self._queued += 1
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self._queued)
+
+        item = (event, time.monotonic())
+        chat_queue = self._chats.get(key)
+        if chat_queue is not None:
+            # Для чата уже работает обработчик - он заберет событие по порядку
+            chat_queue.append(item)
+            return
+
+        self._chats[key] = deque([item])
+        task = asyncio.create_task(self._drain(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, key):
+        chat_queue = self._chats[key]
+        while chat_queue:
+            event, enqueued_at = chat_queue.popleft()
+            failed = False
+
+            async with self._semaphore:
+                started_at = time.monotonic()
+                self._in_flight += 1
+                try:
+                    await self._handler(event)
+                except Exception as e:
+                    failed = True
+                    logger.error(f"Error handling update for {key}: {e}")
+                finally:
+                    self._in_flight -= 1
+                    self.metrics.observe(
+                        wait=started_at - enqueued_at,
+                        latency=time.monotonic() - started_at,
+                        failed=failed
+                    )
+
+            async with self._not_full:
+                self._queued -= 1
+                self._not_full.notify_all()
+
+        del self._chats[key]
+
+    def _ensure_reporter(self):
+        if self._reporter is None and self._metrics_interval > 0:
+            self._reporter = asyncio.create_task(self._report_metrics())
+
+    async def _report_metrics(self):
+        while True:
+            await asyncio.sleep(self._metrics_interval)
+            logger.info(f"Update pool metrics: {self.snapshot()}")
+
+    async def close(self):
+        """Дождаться обработки уже принятых событий"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        if self._reporter is not None:
+            self._reporter.cancel()
+            self._reporter = None
+
+class ConcurrentDispatcher(Dispatcher):
+    """Dispatcher, который передает события в UpdateWorkerPool вместо последовательной обработки"""
+
+    def __init__(self, max_concurrency: int, max_queue: int, metrics_interval: float = 60.0):
+        super().__init__()
+        self.pool = UpdateWorkerPool(
+            self._handle_update,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            metrics_interval=metrics_interval
+        )
+
+    @staticmethod
+    def _ordering_key(event_object):
+        try:
+            chat_id, user_id = event_object.get_ids()
+        except Exception:
+            return None
+        return chat_id if chat_id is not None else user_id
+
+    async def call_handler(self, handler, event_object, data):
+        try:
+            await super().call_handler(handler, event_object, data)
+        except Exception as e:
+            _handler_error.set(e)
+            raise
+
+    async def _handle_update(self, event_object):
+        """Обработка базовым Dispatcher; ошибка обработчика пробрасывается в пул для метрик"""
+        token = _handler_error.set(None)
+        try:
+            await super().handle(event_object)
+            error = _handler_error.get()
+        finally:
+            _handler_error.reset(token)
+        if error is not None:
+            raise error
+
+    async def handle(self, event_object):
+        await self.pool.submit(self._ordering_key(event_object), event_object)
@@ -1,6 +1,7 @@
 from maxapi.types import MessageCallback, CallbackButton, OpenAppButton
 from maxapi.utils.inline_keyboard import InlineKeyboardBuilder
 from app.services.api_client import APIClient
+from app.services.view_cache import view_cache
 from app.config import settings
 import logging
 
@@ -14,23 +15,12 @@ async def handle_callback_notifications(event: MessageCallback):
     notifications_data = await api_client.get_user_notifications(user_id)
     notifications = notifications_data.get("notifications", [])
 
-    # Получаем проекты пользователя для проверки заявок
-    projects_data = await api_client.get_user_projects(user_id)
-
-    pending_requests = []
-    for project_data in projects_data:
-        project = project_data.get("project", {})
-        if project_data.get("role") in ["owner", "admin"]:
-            requests_data = await api_client.get_project_join_requests(
-                project["hash"], user_id, event.from_user.full_name or "Аноним"
-            )
-            for req in requests_data.get("requests", []):
-                if req.get("status") == "pending":
-                    pending_requests.append({
-                        **req,
-                        "project_title": project.get("title", "Без названия"),
-                        "project_hash": project["hash"]
-                    })
+    # Первые заявки и их общее количество - одним запросом
+    requests_data = await api_client.get_pending_join_requests(
+        user_id, event.from_user.full_name or "Аноним", limit=3
+    )
+    pending_requests = requests_data.get("requests", [])
+    pending_total = requests_data.get("total", len(pending_requests))
 
     if not notifications and not pending_requests:
         text = "📭 У вас пока нет уведомлений и заявок."
@@ -38,7 +28,7 @@ async def handle_callback_notifications(event: MessageCallback):
         text = "🔔 Ваши уведомления и заявки:\n\n"
 
         if pending_requests:
-            text += "📋 Заявки на вступление:\n"
+            text += f"📋 Заявки на вступление ({pending_total}):\n"
             for i, req in enumerate(pending_requests[:3], 1):
                 user = req.get("user", {})
                 text += f"{i}. 👤 {user.get('full_name', 'Аноним')}\n"
@@ -78,41 +68,21 @@ async def handle_callback_manage_requests(event: MessageCallback):
     user_id = str(event.from_user.user_id)
     full_name = event.from_user.full_name or "Аноним"
 
-    # Получаем проекты, где пользователь админ/владелец
-    projects_data = await api_client.get_user_projects(user_id)
-    admin_projects = [p for p in projects_data if p.get("role") in ["owner", "admin"]]
-
-    if not admin_projects:
-        text = "❌ У вас нет проектов, где вы являетесь администратором."
-        builder = InlineKeyboardBuilder()
-        builder.row(CallbackButton(text="📋 Мои проекты", payload="projects"))
-        builder.row(CallbackButton(text="🏠 Домой", payload="start"))
-        await event.bot.edit_message(
-            message_id=event.message.body.mid,
-            text=text,
-            attachments=[builder.as_markup()]
-        )
-        return
-
-    # Собираем все pending заявки
-    all_requests = []
-    for project_data in admin_projects:
-        project = project_data.get("project", {})
-        requests_data = await api_client.get_project_join_requests(
-            project["hash"], user_id, full_name
-        )
-        for req in requests_data.get("requests", []):
-            if req.get("status") == "pending":
-                all_requests.append({
-                    **req,
-                    "project_title": project.get("title", "Без названия"),
-                    "project_hash": project["hash"]
-                })
+    # Все pending заявки по проектам, где пользователь админ/владелец
+    all_requests = await api_client.get_all_pending_join_requests(user_id, full_name)
 
     if not all_requests:
-        text = "📭 Нет ожидающих заявок на вступление."
+        # Проекты нужны только здесь, чтобы отличить "нет заявок" от "нет своих проектов"
+        projects_data = await api_client.get_user_projects(user_id)
+        admin_projects = [p for p in projects_data if p.get("role") in ["owner", "admin"]]
+
         builder = InlineKeyboardBuilder()
-        builder.row(CallbackButton(text="🔙 Назад", payload="notifications"))
+        if not admin_projects:
+            text = "❌ У вас нет проектов, где вы являетесь администратором."
+            builder.row(CallbackButton(text="📋 Мои проекты", payload="projects"))
+        else:
+            text = "📭 Нет ожидающих заявок на вступление."
+            builder.row(CallbackButton(text="🔙 Назад", payload="notifications"))
         builder.row(CallbackButton(text="🏠 Домой", payload="start"))
         await event.bot.edit_message(
             message_id=event.message.body.mid,
@@ -189,22 +159,7 @@ async def handle_callback_request_page(event: MessageCallback):
         full_name = event.from_user.full_name or "Аноним"
 
         # Загружаем заявки заново
-        projects_data = await api_client.get_user_projects(user_id)
-        admin_projects = [p for p in projects_data if p.get("role") in ["owner", "admin"]]
-
-        all_requests = []
-        for project_data in admin_projects:
-            project = project_data.get("project", {})
-            requests_data = await api_client.get_project_join_requests(
-                project["hash"], user_id, full_name
-            )
-            for req in requests_data.get("requests", []):
-                if req.get("status") == "pending":
-                    all_requests.append({
-                        **req,
-                        "project_title": project.get("title", "Без названия"),
-                        "project_hash": project["hash"]
-                    })
+        all_requests = await api_client.get_all_pending_join_requests(user_id, full_name)
 
         await show_request_page(event, all_requests, page_index)
 
@@ -242,6 +197,7 @@ async def handle_callback_approve_request(event: MessageCallback):
                 # Уведомляем пользователя
                 target_user_id = approved_request.get("user", {}).get("max_id")
                 if target_user_id:
+                    view_cache.invalidate(target_user_id)
                     try:
                         project_info = await api_client.get_project_summary(
                             project_hash, user_id, full_name
@@ -307,6 +263,7 @@ async def handle_callback_reject_request(event: MessageCallback):
                 # Уведомляем пользователя
                 target_user_id = rejected_request.get("user", {}).get("max_id")
                 if target_user_id:
+                    view_cache.invalidate(target_user_id)
                     try:
                         project_info = await api_client.get_project_summary(
                             project_hash, user_id, full_name
@@ -93,10 +93,9 @@ async def cmd_my_projects(event: MessageCreated):
     user_id = str(event.from_user.user_id)
     full_name = event.from_user.full_name or "Аноним"
 
-    # Получаем дашборд для полной информации
-    dashboard = await api_client.get_user_dashboard(user_id, full_name)
+    summary = await api_client.get_bot_summary(user_id, full_name)
 
-    if not dashboard or not dashboard.get("projects"):
+    if not summary or not summary.get("projects"):
         text = (
             "📂 Ваши проекты\n\n"
             "У вас пока нет проектов. Создайте первый проект и начните управлять задачами!\n\n"
@@ -117,29 +116,29 @@ async def cmd_my_projects(event: MessageCreated):
         await event.message.answer(text, attachments=[builder.as_markup()])
         return
 
-    projects = dashboard.get("projects", [])
+    projects = summary.get("projects", [])
 
     text = "📂 Ваши проекты\n\n"
 
     for i, project in enumerate(projects[:10], 1):  # Ограничиваем 10 проектами
-        stats = project.get("stats", {})
+        tasks = project.get("tasks", {})
         role_emoji = {
             "owner": "👑",
             "admin": "⚡",
             "member": "👤",
             "guest": "👀"
-        }.get(project.get("current_user_role", "member"), "👤")
+        }.get(project.get("role", "member"), "👤")
 
         # Эмодзи для приватности
         privacy_emoji = "🔒" if project.get("is_private") else "🌐"
 
         text += (
             f"{i}. {role_emoji} {project.get('title', 'Без названия')} {privacy_emoji}\n"
-            f"   📊 Задачи: {stats.get('total_tasks', 0)} "
-            f"(✅ {stats.get('done_tasks', 0)} | "
-            f"🔄 {stats.get('in_progress_tasks', 0)} | "
-            f"⏳ {stats.get('todo_tasks', 0)})\n"
-            f"   👥 Участников: {stats.get('members_count', 0)}\n"
+            f"   📊 Задачи: {tasks.get('total', 0)} "
+            f"(✅ {tasks.get('done', 0)} | "
+            f"🔄 {tasks.get('in_progress', 0)} | "
+            f"⏳ {tasks.get('todo', 0)})\n"
+            f"   👥 Участников: {project.get('members_count', 0)}\n"
             f"   🔗 Хэш: `{project.get('hash', '')}`\n\n"
         )
 
@@ -325,13 +324,13 @@ async def handle_callback_stats(event: MessageCallback):
     user_id = str(event.from_user.user_id)
     full_name = event.from_user.full_name or "Аноним"
 
-    dashboard = await api_client.get_user_dashboard(user_id, full_name)
+    summary = await api_client.get_bot_summary(user_id, full_name)
 
-    if not dashboard:
+    if not summary:
         await event.answer(notification="❌ Не удалось загрузить статистику")
         return
 
-    projects = dashboard.get("projects", [])
+    projects = summary.get("projects", [])
     total_projects = len(projects)
 
     # Считаем общую статистику
@@ -342,12 +341,12 @@ async def handle_callback_stats(event: MessageCallback):
     total_members = 0
 
     for project in projects:
-        stats = project.get("stats", {})
-        total_tasks += stats.get("total_tasks", 0)
-        done_tasks += stats.get("done_tasks", 0)
-        in_progress_tasks += stats.get("in_progress_tasks", 0)
-        todo_tasks += stats.get("todo_tasks", 0)
-        total_members += stats.get("members_count", 0)
+        tasks = project.get("tasks", {})
+        total_tasks += tasks.get("total", 0)
+        done_tasks += tasks.get("done", 0)
+        in_progress_tasks += tasks.get("in_progress", 0)
+        todo_tasks += tasks.get("todo", 0)
+        total_members += project.get("members_count", 0)
 
     completion_rate = (done_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
@@ -359,7 +358,9 @@ async def handle_callback_stats(event: MessageCallback):
         f"🔄 В работе: {in_progress_tasks}\n"
         f"⏳ Осталось: {todo_tasks}\n"
         f"👥 Участников в проектах: {total_members}\n"
-        f"📈 Процент выполнения: {completion_rate:.1f}%\n\n"
+        f"📈 Процент выполнения: {completion_rate:.1f}%\n"
+        f"📥 Заявок на рассмотрении: {summary.get('pending_requests', 0)}\n"
+        f"🔔 Непрочитанных уведомлений: {summary.get('unread_notifications', 0)}\n\n"
 
         "💡 Советы:\n"
         "• Ставьте реалистичные сроки\n"
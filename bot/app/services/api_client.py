@@ -1,15 +1,52 @@
 import aiohttp
 from app.config import settings
+from app.services.singleflight import SingleFlight
+from app.services.view_cache import view_cache
 from loguru import logger
 
+# Одинаковые запросы к бэкенду, пришедшие одновременно, выполняются один раз
+api_flight = SingleFlight()
+
+# Заглушки имени для вызовов, где настоящего профиля нет: их не отправляем,
+# чтобы не перезаписать имя пользователя в бэкенде
+_PLACEHOLDER_NAMES = {"User", "Anonymous"}
+
 class APIClient:
     def __init__(self):
         self.base_url = settings.BACKEND_API_URL
 
+    async def _get_service_token(self, user_id: str, full_name: str | None = None):
+        """Токен через сервисный эндпоинт; имя передается, чтобы бэкенд обновил профиль"""
+        if not settings.SERVICE_API_KEY:
+            return None
+
+        token_url = f"{self.base_url}/auth/service-token"
+        headers = {"X-Service-Key": settings.SERVICE_API_KEY}
+        token_data = {"max_id": user_id}
+        if full_name and full_name not in _PLACEHOLDER_NAMES:
+            token_data["full_name"] = full_name
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(token_url, json=token_data, headers=headers) as response:
+                    if response.status == 200:
+                        token_response = await response.json()
+                        return token_response.get("access_token")
+        except Exception as e:
+            logger.error(f"Error getting service token: {e}")
+        return None
+
     async def _get_auth_token(self, user_id: str, full_name: str):
         """Вспомогательный метод для получения токена"""
+        token = await self._get_service_token(user_id, full_name)
+        if token:
+            return token
+
+        # Пользователь еще не зарегистрирован или сервисный ключ не задан
         token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
+        token_data = {"max_id": user_id}
+        if full_name and full_name not in _PLACEHOLDER_NAMES:
+            token_data["full_name"] = full_name
 
         try:
             async with aiohttp.ClientSession() as session:
@@ -42,47 +79,44 @@ class APIClient:
             return None
 
     async def get_user_projects(self, user_id: str):
-        # Сначала получаем токен для пользователя
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": "User", "username": ""}
+        projects = await view_cache.get_or_load(
+            user_id, "projects",
+            lambda: api_flight.do(
+                ("projects", user_id, view_cache.generation),
+                lambda: self._fetch_user_projects(user_id)
+            )
+        )
+        return projects if projects is not None else []
+
+    async def _fetch_user_projects(self, user_id: str):
+        access_token = await self._get_auth_token(user_id, "User")
+        if not access_token:
+            return None
+
+        url = f"{self.base_url}/users/{user_id}/projects"
+        headers = {"Authorization": f"Bearer {access_token}"}
 
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-
-                        if access_token:
-                            # Теперь делаем запрос с токеном
-                            url = f"{self.base_url}/users/{user_id}/projects"
-                            headers = {"Authorization": f"Bearer {access_token}"}
-
-                            async with session.get(url, headers=headers) as projects_response:
-                                if projects_response.status == 200:
-                                    data = await projects_response.json()
-                                    return data.get("projects", [])
-                                else:
-                                    logger.error(f"API Error: {projects_response.status} for URL: {url}")
-                                    return []
+                async with session.get(url, headers=headers) as projects_response:
+                    if projects_response.status == 200:
+                        data = await projects_response.json()
+                        return data.get("projects", [])
+                    else:
+                        logger.error(f"API Error: {projects_response.status} for URL: {url}")
+                        return None
         except Exception as e:
             logger.error(f"Network error in get_user_projects: {e}")
-        return []
+        return None
 
     async def create_project(self, user_id: str, full_name: str, title: str, description: str = ""):
-        url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._create_project_with_token(title, description, access_token)
-        except Exception as e:
-            logger.error(f"Error getting token: {e}")
-        return None
+        access_token = await self._get_auth_token(user_id, full_name)
+        if not access_token:
+            return None
+        # Сбрасываем кэш после записи: чтение до нее снова закэшировало бы старый экран
+        project = await self._create_project_with_token(title, description, access_token)
+        view_cache.invalidate(user_id)
+        return project
 
     async def _create_project_with_token(self, title: str, description: str, token: str):
         url = f"{self.base_url}/projects/"
@@ -102,19 +136,12 @@ class APIClient:
         pass
 
     async def request_join_project(self, project_hash: str, user_id: str, full_name: str):
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._request_join_with_token(project_hash, access_token)
-        except Exception as e:
-            logger.error(f"Error getting token for join: {e}")
-        return {"status": "error", "message": "Failed to get token"}
+        access_token = await self._get_auth_token(user_id, full_name)
+        if not access_token:
+            return {"status": "error", "message": "Failed to get token"}
+        result = await self._request_join_with_token(project_hash, access_token)
+        view_cache.invalidate(user_id)
+        return result
 
     async def _request_join_with_token(self, project_hash: str, token: str):
         url = f"{self.base_url}/projects/{project_hash}/join"
@@ -134,19 +161,13 @@ class APIClient:
         return {"status": "error", "message": "Failed to join project"}
 
     async def get_user_notifications(self, user_id: str):
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": "Anonymous"}
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._get_notifications_with_token(access_token)
-        except Exception as e:
-            logger.error(f"Error getting token for notifications: {e}")
-        return {"notifications": []}
+        return await api_flight.do(("notifications", user_id), lambda: self._fetch_user_notifications(user_id))
+
+    async def _fetch_user_notifications(self, user_id: str):
+        access_token = await self._get_auth_token(user_id, "Anonymous")
+        if not access_token:
+            return {"notifications": []}
+        return await self._get_notifications_with_token(access_token)
 
     async def _get_notifications_with_token(self, token: str):
         url = f"{self.base_url}/notifications/"
@@ -161,19 +182,10 @@ class APIClient:
         return {"notifications": []}
 
     async def get_project_summary(self, project_hash: str, user_id: str, full_name: str):
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._get_project_summary_with_token(project_hash, access_token)
-        except Exception as e:
-            logger.error(f"Error getting token for project summary: {e}")
-        return None
+        access_token = await self._get_auth_token(user_id, full_name)
+        if not access_token:
+            return None
+        return await self._get_project_summary_with_token(project_hash, access_token)
 
     async def _get_project_summary_with_token(self, project_hash: str, token: str):
         url = f"{self.base_url}/projects/{project_hash}/summary"
@@ -188,19 +200,10 @@ class APIClient:
         return None
 
     async def get_project_join_requests(self, project_hash: str, user_id: str, full_name: str):
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._get_project_join_requests_with_token(project_hash, access_token)
-        except Exception as e:
-            logger.error(f"Error getting token for join requests: {e}")
-        return {"requests": []}
+        access_token = await self._get_auth_token(user_id, full_name)
+        if not access_token:
+            return {"requests": []}
+        return await self._get_project_join_requests_with_token(project_hash, access_token)
 
     async def _get_project_join_requests_with_token(self, project_hash: str, token: str):
         url = f"{self.base_url}/projects/{project_hash}/join-requests"
@@ -214,20 +217,55 @@ class APIClient:
             logger.error(f"Error getting join requests: {e}")
         return {"requests": []}
 
-    async def approve_join_request(self, project_hash: str, request_id: int, user_id: str, full_name: str):
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
+    async def get_pending_join_requests(self, user_id: str, full_name: str, limit: int = 100, cursor: int = None):
+        """Ожидающие заявки во всех проектах, где пользователь админ/владелец"""
+        data = await view_cache.get_or_load(
+            user_id, f"requests:{limit}:{cursor}",
+            lambda: api_flight.do(
+                ("requests", user_id, limit, cursor, view_cache.generation),
+                lambda: self._fetch_pending_join_requests(user_id, full_name, limit, cursor)
+            )
+        )
+        return data if data is not None else {"requests": [], "total": 0}
+
+    async def get_all_pending_join_requests(self, user_id: str, full_name: str):
+        """Все ожидающие заявки: проходим страницы по next_cursor"""
+        requests = []
+        cursor = None
+        while True:
+            data = await self.get_pending_join_requests(user_id, full_name, cursor=cursor)
+            requests.extend(data.get("requests", []))
+            cursor = data.get("next_cursor")
+            if cursor is None:
+                return requests
+
+    async def _fetch_pending_join_requests(self, user_id: str, full_name: str, limit: int, cursor: int):
+        token = await self._get_auth_token(user_id, full_name)
+        if not token:
+            return None
+
+        url = f"{self.base_url}/join-requests/pending"
+        headers = {"Authorization": f"Bearer {token}"}
+        params = {"limit": limit}
+        if cursor is not None:
+            params["cursor"] = cursor
+
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
+                async with session.get(url, headers=headers, params=params) as response:
                     if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._approve_join_request_with_token(project_hash, request_id, access_token)
+                        return await response.json()
         except Exception as e:
-            logger.error(f"Error getting token for approve: {e}")
-        return {"status": "error", "message": "Failed to approve"}
+            logger.error(f"Error getting pending join requests: {e}")
+        return None
+
+    async def approve_join_request(self, project_hash: str, request_id: int, user_id: str, full_name: str):
+        access_token = await self._get_auth_token(user_id, full_name)
+        if not access_token:
+            return {"status": "error", "message": "Failed to approve"}
+        result = await self._approve_join_request_with_token(project_hash, request_id, access_token)
+        view_cache.invalidate(user_id)
+        return result
 
     async def _approve_join_request_with_token(self, project_hash: str, request_id: int, token: str):
         url = f"{self.base_url}/projects/{project_hash}/join-requests/{request_id}/approve"
@@ -242,19 +280,12 @@ class APIClient:
         return {"status": "error", "message": "Failed to approve"}
 
     async def reject_join_request(self, project_hash: str, request_id: int, user_id: str, full_name: str):
-        token_url = f"{self.base_url}/auth/token"
-        token_data = {"max_id": user_id, "full_name": full_name}
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, json=token_data) as response:
-                    if response.status == 200:
-                        token_response = await response.json()
-                        access_token = token_response.get("access_token")
-                        if access_token:
-                            return await self._reject_join_request_with_token(project_hash, request_id, access_token)
-        except Exception as e:
-            logger.error(f"Error getting token for reject: {e}")
-        return {"status": "error", "message": "Failed to reject"}
+        access_token = await self._get_auth_token(user_id, full_name)
+        if not access_token:
+            return {"status": "error", "message": "Failed to reject"}
+        result = await self._reject_join_request_with_token(project_hash, request_id, access_token)
+        view_cache.invalidate(user_id)
+        return result
 
     async def _reject_join_request_with_token(self, project_hash: str, request_id: int, token: str):
         url = f"{self.base_url}/projects/{project_hash}/join-requests/{request_id}/reject"
@@ -304,8 +335,44 @@ class APIClient:
             logger.error(f"Error getting project details: {e}")
         return None
 
+    async def get_bot_summary(self, user_id: str, full_name: str):
+        """Компактная сводка: проекты со счетчиками, заявки и непрочитанные уведомления"""
+        return await view_cache.get_or_load(
+            user_id, "summary",
+            lambda: api_flight.do(
+                ("summary", user_id, view_cache.generation),
+                lambda: self._fetch_bot_summary(user_id, full_name)
+            )
+        )
+
+    async def _fetch_bot_summary(self, user_id: str, full_name: str):
+        token = await self._get_auth_token(user_id, full_name)
+        if not token:
+            return None
+
+        url = f"{self.base_url}/bot/summary"
+        headers = {"Authorization": f"Bearer {token}"}
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 200:
+                        return await response.json()
+        except Exception as e:
+            logger.error(f"Error getting bot summary: {e}")
+        return None
+
     async def get_user_dashboard(self, user_id: str, full_name: str):
         """Получить данные дашборда пользователя"""
+        return await view_cache.get_or_load(
+            user_id, "dashboard",
+            lambda: api_flight.do(
+                ("dashboard", user_id, view_cache.generation),
+                lambda: self._fetch_user_dashboard(user_id, full_name)
+            )
+        )
+
+    async def _fetch_user_dashboard(self, user_id: str, full_name: str):
         token = await self._get_auth_token(user_id, full_name)
         if not token:
             return None
@@ -0,0 +1,40 @@
+# bot/app/services/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Объединяет одновременные одинаковые вызовы в одно выполнение.
+
+    Пока вычисление по ключу не завершено, все вызовы с тем же ключом
+    ждут его и получают тот же результат (или то же исключение).
+    Отмена одного из ожидающих не отменяет общее вычисление.
+    Работает в пределах одного процесса.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        # Всего вызовов и сколько из них получили чужой результат
+        self.calls = 0
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Помечаем исключение как полученное, даже если все ожидающие отменены
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,84 @@
+# bot/app/services/view_cache.py
+import time
+from collections import OrderedDict
+from app.config import settings
+
+class ViewCache:
+    """LRU-кэш экранов бота с коротким TTL. Ключ - (пользователь, представление)"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Загрузки в работе по пользователю: [сколько идет, сколько было сбросов за это время].
+        # Запись живет, пока идет хотя бы одна загрузка, поэтому словарь не растет бесконечно
+        self._loads = {}
+        # Всего сбросов: входит в ключи SingleFlight, чтобы чтение после записи
+        # не присоединилось к загрузке, начатой до нее
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, view: str):
+        key = (user_id, view)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, user_id: str, view: str, value):
+        key = (user_id, view)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        # Вытесняем самые давно использованные записи
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, view: str = None):
+        """Сбросить одно представление пользователя или все сразу"""
+        self.generation += 1
+        loads = self._loads.get(user_id)
+        if loads is not None:
+            loads[1] += 1
+        if view is not None:
+            self._entries.pop((user_id, view), None)
+            return
+
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+
+    async def get_or_load(self, user_id: str, view: str, loader):
+        """Вернуть значение из кэша или загрузить его. None не кэшируется"""
+        value = self.get(user_id, view)
+        if value is not None:
+            return value
+
+        # Загрузка, во время которой был сброс, могла прочитать данные до записи - не кэшируем
+        loads = self._loads.setdefault(user_id, [0, 0])
+        loads[0] += 1
+        generation = loads[1]
+        try:
+            value = await loader()
+        finally:
+            loads[0] -= 1
+            if loads[0] == 0:
+                self._loads.pop(user_id, None)
+        if value is not None and loads[1] == generation:
+            self.set(user_id, view, value)
+        return value
+
+view_cache = ViewCache(
+    ttl=settings.VIEW_CACHE_TTL_SECONDS,
+    max_entries=settings.VIEW_CACHE_MAX_ENTRIES
+)
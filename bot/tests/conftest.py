@@ -0,0 +1,9 @@
+# bot/tests/conftest.py
+"""
+Тесты бота выполняются без сети: обращения к бэкенду подменяются в самих тестах.
+Настройки бота читаются при импорте, поэтому обязательные переменные задаем заранее.
+"""
+import os
+
+os.environ.setdefault("BOT_TOKEN", "test-bot-token")
+os.environ.setdefault("BACKEND_API_URL", "http://localhost/api")
@@ -0,0 +1,119 @@
+# bot/tests/test_api_client.py
+"""Кэш экранов не должен возвращать состояние до записи"""
+import asyncio
+
+from app.services.api_client import APIClient
+
+
+def _client_with_backend(monkeypatch, projects):
+    api = APIClient()
+
+    async def get_auth_token(user_id, full_name):
+        return "token"
+
+    async def fetch_user_projects(user_id):
+        return list(projects)
+
+    monkeypatch.setattr(api, "_get_auth_token", get_auth_token)
+    monkeypatch.setattr(api, "_fetch_user_projects", fetch_user_projects)
+    return api
+
+
+async def test_read_during_create_does_not_cache_old_projects(monkeypatch):
+    projects = ["old"]
+    api = _client_with_backend(monkeypatch, projects)
+
+    async def create_project_with_token(title, description, token):
+        # Пока бэкенд обрабатывает запрос, параллельное чтение видит старый список
+        assert await api.get_user_projects("u-create") == ["old"]
+        projects.append(title)
+        return {"title": title}
+
+    monkeypatch.setattr(api, "_create_project_with_token", create_project_with_token)
+
+    await api.create_project("u-create", "Name", "new")
+
+    assert await api.get_user_projects("u-create") == ["old", "new"]
+
+
+async def test_read_started_before_join_is_not_cached(monkeypatch):
+    projects = ["old"]
+    api = _client_with_backend(monkeypatch, projects)
+    loaded = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_fetch_user_projects(user_id):
+        snapshot = list(projects)
+        if not loaded.is_set():
+            loaded.set()
+            await release.wait()
+        return snapshot
+
+    async def request_join_with_token(project_hash, token):
+        projects.append(project_hash)
+        return {"status": "pending"}
+
+    monkeypatch.setattr(api, "_fetch_user_projects", slow_fetch_user_projects)
+    monkeypatch.setattr(api, "_request_join_with_token", request_join_with_token)
+
+    # Чтение прочитало данные до записи, а закончилось после сброса кэша
+    read = asyncio.create_task(api.get_user_projects("u-join"))
+    await loaded.wait()
+    await api.request_join_project("joined", "u-join", "Name")
+    release.set()
+    assert await read == ["old"]
+    assert await api.get_user_projects("u-join") == ["old", "joined"]
+
+
+async def test_all_pending_join_requests_follow_next_cursor(monkeypatch):
+    api = APIClient()
+    pages = {
+        None: {"requests": [{"id": 1}, {"id": 2}], "total": 3, "next_cursor": 2},
+        2: {"requests": [{"id": 3}], "total": 3, "next_cursor": None},
+    }
+
+    async def get_auth_token(user_id, full_name):
+        return "token"
+
+    async def fetch_pending_join_requests(user_id, full_name, limit, cursor):
+        return pages[cursor]
+
+    monkeypatch.setattr(api, "_get_auth_token", get_auth_token)
+    monkeypatch.setattr(api, "_fetch_pending_join_requests", fetch_pending_join_requests)
+
+    requests = await api.get_all_pending_join_requests("u-pending", "Name")
+
+    assert [request["id"] for request in requests] == [1, 2, 3]
+
+
+async def test_read_after_write_does_not_join_earlier_flight(monkeypatch):
+    projects = ["old"]
+    api = _client_with_backend(monkeypatch, projects)
+    first_loaded = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fetch_user_projects(user_id):
+        snapshot = list(projects)
+        if not first_loaded.is_set():
+            first_loaded.set()
+            await release.wait()
+        return snapshot
+
+    async def create_project_with_token(title, description, token):
+        projects.append(title)
+        return {"title": title}
+
+    monkeypatch.setattr(api, "_fetch_user_projects", fetch_user_projects)
+    monkeypatch.setattr(api, "_create_project_with_token", create_project_with_token)
+
+    # load -> write -> load: второе чтение не должно получить результат первого
+    first = asyncio.create_task(api.get_user_projects("u-flight"))
+    await first_loaded.wait()
+    await api.create_project("u-flight", "Name", "new")
+    second = asyncio.create_task(api.get_user_projects("u-flight"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == ["old"]
+    assert await second == ["old", "new"]
+    assert await api.get_user_projects("u-flight") == ["old", "new"]
@@ -0,0 +1,35 @@
+# bot/tests/test_dispatcher.py
+"""Метрики пула обновлений считают ошибки обработчиков"""
+from maxapi.enums.update import UpdateType
+
+from app.dispatcher import ConcurrentDispatcher
+
+
+class FakeCallback:
+    update_type = UpdateType.MESSAGE_CALLBACK
+
+    def __init__(self, chat_id: int, payload: str):
+        self.chat_id = chat_id
+        self.payload = payload
+
+    def get_ids(self):
+        return self.chat_id, self.chat_id
+
+
+async def test_raising_handler_is_counted_as_failed():
+    dp = ConcurrentDispatcher(max_concurrency=4, max_queue=10, metrics_interval=0)
+    dp.routers.append(dp)
+
+    @dp.message_callback()
+    async def handle(event: FakeCallback):
+        if event.payload == "boom":
+            raise RuntimeError("handler failed")
+
+    await dp.handle(FakeCallback(1, "ok"))
+    await dp.handle(FakeCallback(2, "boom"))
+    await dp.handle(FakeCallback(1, "boom"))
+    await dp.pool.close()
+
+    snapshot = dp.pool.snapshot()
+    assert snapshot["processed"] == 3
+    assert snapshot["failed"] == 2
@@ -0,0 +1,18 @@
+# bot/tests/test_view_cache.py
+"""Служебное состояние ViewCache не растет с числом пользователей"""
+from app.services.view_cache import ViewCache
+
+
+async def test_invalidations_do_not_leave_state_behind():
+    cache = ViewCache(ttl=60, max_entries=2)
+
+    async def load():
+        return "view"
+
+    for i in range(100):
+        user_id = f"u{i}"
+        await cache.get_or_load(user_id, "projects", load)
+        cache.invalidate(user_id)
+
+    assert cache._loads == {}
+    assert len(cache._entries) <= 2
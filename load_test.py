@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+MAX Project Pilot - Load Test Script
+Generates concurrent load against a running backend and reports per-endpoint
+latency percentiles (p50/p95/p99) and throughput to JSON.
+
+Example:
+    python load_test.py --users 50 --ramp-up 10 --duration 60 \
+        --mix dashboard=5,tasks=3,bot=2 --output load_report.json
+"""
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+import aiohttp
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCENARIOS = ("dashboard", "tasks", "bot")
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Перцентиль с линейной интерполяцией"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def record(self, latency: float, status: int, ok: bool):
+        self.latencies.append(latency)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        count = len(self.latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / duration, 2) if duration else 0.0,
+            "mean_ms": round(sum(self.latencies) / count * 1000, 2) if count else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "max_ms": round(max(self.latencies, default=0.0) * 1000, 2),
+            "statuses": self.statuses,
+        }
+
+
+class VirtualUser:
+    """Один виртуальный пользователь: свой токен, свой проект, своя история задач"""
+
+    def __init__(self, index: int, max_id: str):
+        self.index = index
+        self.max_id = max_id
+        self.full_name = f"Load User {index}"
+        self.token = None
+        self.project_hash = None
+        self.task_ids = []
+
+
+class LoadTester:
+    def __init__(self, base_url: str, users: int, ramp_up: float, duration: float,
+                 mix: Dict[str, int], think_time: float, service_key: str = "", seed: Optional[int] = None):
+        self.base_url = base_url.rstrip('/')
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.mix = mix
+        self.think_time = think_time
+        self.service_key = service_key
+        self.random = random.Random(seed)
+        self.run_id = f"{int(time.time())}"
+        self.session = None
+        self.stats: Dict[str, EndpointStats] = {}
+        self.scenario_counts = {name: 0 for name in SCENARIOS}
+        self.started_at = None
+        self.finished_at = None
+        self.started_wall = None
+
+    async def __aenter__(self):
+        # Лимит соединений не должен быть узким местом самого генератора нагрузки
+        connector = aiohttp.TCPConnector(limit=max(100, self.users * 2))
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session:
+            await self.session.close()
+
+    async def make_request(self, method: str, endpoint: str, name: str = None, data=None, token=None,
+                           headers: Dict[str, str] = None, expected_status=200):
+        """Выполняет запрос и записывает задержку под именем шаблона эндпоинта"""
+        url = f"{self.base_url}{endpoint}"
+        request_headers = dict(headers or {})
+        if token:
+            request_headers['Authorization'] = f'Bearer {token}'
+
+        label = f"{method} {name or endpoint}"
+        started = time.perf_counter()
+        status = 0
+        json_data = {}
+        try:
+            async with self.session.request(method, url, headers=request_headers, json=data) as resp:
+                status = resp.status
+                if 'application/json' in resp.content_type:
+                    json_data = await resp.json()
+                else:
+                    await resp.read()
+        except Exception as e:
+            json_data = {'error': str(e)}
+
+        latency = time.perf_counter() - started
+        # Прогрев и подготовка данных не попадают в отчет
+        if self.started_at is not None:
+            self.stats.setdefault(label, EndpointStats()).record(latency, status, status == expected_status)
+        return json_data if status == expected_status else None
+
+    async def setup_user(self, user: VirtualUser):
+        result = await self.make_request('POST', '/api/auth/token',
+                                         data={"max_id": user.max_id, "full_name": user.full_name, "username": ""})
+        if not result:
+            return False
+        user.token = result['access_token']
+
+        project = await self.make_request('POST', '/api/projects/', token=user.token, data={
+            "title": f"Load Project {user.index}",
+            "description": "Created by load_test.py",
+            "is_private": False,
+            "requires_approval": False
+        })
+        if project and 'project' in project:
+            user.project_hash = project['project']['hash']
+        return True
+
+    async def scenario_dashboard(self, user: VirtualUser):
+        """Открытие мини-приложения: дашборд, проекты, уведомления"""
+        await self.make_request('GET', '/api/dashboard/', token=user.token)
+        await self.make_request('GET', '/api/users/me/projects', name='/api/users/{user_id}/projects', token=user.token)
+        await self.make_request('GET', '/api/notifications/', token=user.token)
+        if user.project_hash:
+            await self.make_request('GET', f'/api/projects/{user.project_hash}',
+                                    name='/api/projects/{project_hash}', token=user.token)
+
+    async def scenario_tasks(self, user: VirtualUser):
+        """Работа с задачами: создание, смена статуса, список, удаление старых"""
+        if not user.project_hash:
+            return
+
+        task = await self.make_request('POST', '/api/tasks/', token=user.token, data={
+            "title": f"Load task {self.random.randint(0, 10 ** 6)}",
+            "project_hash": user.project_hash,
+            "description": "",
+            "priority": self.random.choice(["low", "medium", "high", "urgent"]),
+            "status": "todo",
+            "due_date": (datetime.now() + timedelta(days=self.random.randint(1, 30))).isoformat()
+        })
+        if task and 'task' in task:
+            task_id = task['task']['id']
+            user.task_ids.append(task_id)
+            await self.make_request('PUT', f'/api/tasks/{task_id}/status?status=in_progress',
+                                    name='/api/tasks/{task_id}/status', token=user.token)
+
+        await self.make_request('GET', f'/api/tasks/?project_hash={user.project_hash}',
+                                name='/api/tasks/?project_hash', token=user.token)
+
+        # Держим количество задач у пользователя ограниченным
+        if len(user.task_ids) > 20:
+            old_id = user.task_ids.pop(0)
+            await self.make_request('DELETE', f'/api/tasks/{old_id}', name='/api/tasks/{task_id}', token=user.token)
+
+    async def scenario_bot(self, user: VirtualUser):
+        """Поведение бота: получение токена на каждое действие и компактные экраны"""
+        if self.service_key:
+            token_data = await self.make_request('POST', '/api/auth/service-token',
+                                                 data={"max_id": user.max_id},
+                                                 headers={"X-Service-Key": self.service_key})
+        else:
+            token_data = await self.make_request('POST', '/api/auth/token',
+                                                 data={"max_id": user.max_id, "full_name": user.full_name})
+        token = token_data['access_token'] if token_data else user.token
+
+        await self.make_request('GET', '/api/bot/summary', token=token)
+        await self.make_request('GET', '/api/join-requests/pending?limit=3',
+                                name='/api/join-requests/pending', token=token)
+        await self.make_request('GET', '/api/notifications/', token=token)
+
+    def pick_scenario(self) -> str:
+        names = [name for name in SCENARIOS if self.mix.get(name, 0) > 0]
+        weights = [self.mix[name] for name in names]
+        return self.random.choices(names, weights=weights)[0]
+
+    async def run_user(self, user: VirtualUser, start_delay: float, deadline: float):
+        await asyncio.sleep(start_delay)
+        while time.perf_counter() < deadline:
+            scenario = self.pick_scenario()
+            self.scenario_counts[scenario] += 1
+            await getattr(self, f"scenario_{scenario}")(user)
+            if self.think_time:
+                await asyncio.sleep(self.random.uniform(0, self.think_time))
+
+    async def run(self) -> Dict[str, Any]:
+        print(f"🚀 Load test: {self.users} users, ramp-up {self.ramp_up}s, duration {self.duration}s, mix {self.mix}")
+        print(f"📡 Base URL: {self.base_url}")
+
+        users = [VirtualUser(i, f"load_{self.run_id}_{i}") for i in range(self.users)]
+        ready = await asyncio.gather(*(self.setup_user(user) for user in users))
+        users = [user for user, ok in zip(users, ready) if ok]
+        if not users:
+            raise RuntimeError("Could not authenticate any virtual user")
+        print(f"👥 Prepared {len(users)} virtual users")
+
+        self.started_wall = datetime.now()
+        self.started_at = time.perf_counter()
+        deadline = self.started_at + self.duration
+        step = self.ramp_up / len(users) if self.ramp_up else 0
+        await asyncio.gather(*(self.run_user(user, i * step, deadline) for i, user in enumerate(users)))
+        self.finished_at = time.perf_counter()
+
+        return self.build_report(len(users))
+
+    def build_report(self, active_users: int) -> Dict[str, Any]:
+        elapsed = self.finished_at - self.started_at
+        total = EndpointStats()
+        for endpoint_stats in self.stats.values():
+            total.latencies.extend(endpoint_stats.latencies)
+            total.errors += endpoint_stats.errors
+            for code, count in endpoint_stats.statuses.items():
+                total.statuses[code] = total.statuses.get(code, 0) + count
+
+        return {
+            "base_url": self.base_url,
+            "started_at": self.started_wall.isoformat(),
+            "config": {
+                "users": active_users,
+                "ramp_up": self.ramp_up,
+                "duration": self.duration,
+                "mix": self.mix,
+                "think_time": self.think_time,
+            },
+            "elapsed_seconds": round(elapsed, 2),
+            "scenarios": self.scenario_counts,
+            "total": total.report(elapsed),
+            "endpoints": {name: self.stats[name].report(elapsed) for name in sorted(self.stats)},
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 100)
+    print("📊 LOAD TEST REPORT")
+    print("=" * 100)
+    print(f"{'Endpoint':<48}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, row in report["endpoints"].items():
+        print(f"{name[:47]:<48}{row['requests']:>8}{row['errors']:>6}{row['throughput_rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+    total = report["total"]
+    print("-" * 100)
+    print(f"{'TOTAL':<48}{total['requests']:>8}{total['errors']:>6}{total['throughput_rps']:>9}"
+          f"{total['p50_ms']:>9}{total['p95_ms']:>9}{total['p99_ms']:>9}")
+    print(f"⏱️ Elapsed: {report['elapsed_seconds']} seconds, scenarios: {report['scenarios']}")
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("Scenario mix must have at least one positive weight")
+    return mix
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MAX Project Pilot load test")
+    parser.add_argument('--base-url', default=os.getenv('BACKEND_API_URL', 'http://localhost:8000'))
+    parser.add_argument('--users', type=int, default=20, help="Number of concurrent virtual users")
+    parser.add_argument('--ramp-up', type=float, default=5.0, help="Seconds to start all users")
+    parser.add_argument('--duration', type=float, default=30.0, help="Measured run length in seconds")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix("dashboard=5,tasks=3,bot=2"),
+                        help="Scenario weights, e.g. dashboard=5,tasks=3,bot=2")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Max random pause between scenarios")
+    parser.add_argument('--service-key', default=os.getenv('SERVICE_API_KEY', ''))
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default='load_report.json', help="Path of the JSON report")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    if base_url.endswith('/api'):
+        base_url = base_url[:-4]
+
+    async with LoadTester(base_url, args.users, args.ramp_up, args.duration, args.mix,
+                          args.think_time, args.service_key, args.seed) as tester:
+        try:
+            report = await tester.run()
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+
+    print_report(report)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved to {args.output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -42,6 +42,8 @@ let currentSort = {
 
 let allTasks = [];
 let allProjects = [];
+// Фасеты последнего /tasks/query: число задач по статусам, приоритетам и исполнителям
+let taskFacets = null;
 
 // Утилиты для UI
 class UIUtils {
@@ -342,6 +344,11 @@ class ApiService {
         return this.get(`/projects/${projectHash}/members`);
     }
 
+    // Участники всех проектов пользователя с числом общих проектов
+    static async getMyTeam(limit = 20) {
+        return this.get(`/users/me/team?limit=${limit}`);
+    }
+
     static async updateMemberRole(projectHash, userId, role) {
         return this.put(`/projects/${projectHash}/members/${userId}`, { role });
     }
@@ -390,6 +397,34 @@ class ApiService {
         return this.get(`/tasks/projects/${projectHash}/tasks`);
     }
 
+    // Незавершенные задачи: scope = assigned (назначенные мне) или created (созданные мной)
+    static async getMyTasks(scope = 'assigned', bucket = '') {
+        const params = new URLSearchParams({ scope, include_comments: true });
+        if (bucket) params.append('bucket', bucket);
+        return this.get(`/tasks/mine?${params.toString()}`);
+    }
+
+    // Задачи со сроком в [from, to); mode = 'days' - только число задач по дням
+    static async getCalendar(from, to, mode = 'tasks', projects = '') {
+        const params = new URLSearchParams({ from, to, mode });
+        if (projects) params.append('projects', projects);
+        return this.get(`/tasks/calendar?${params.toString()}`);
+    }
+
+    // Задача со всем деревом подзадач и сводкой выполнения по каждому узлу
+    static async getTaskTree(taskId, maxDepth = 10) {
+        return this.get(`/tasks/${taskId}/tree?max_depth=${maxDepth}`);
+    }
+
+    // Фильтрация, сортировка и фасеты на сервере
+    static async queryTasks(params = {}) {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== undefined && value !== null && value !== '') query.append(key, value);
+        });
+        return this.get(`/tasks/query?${query.toString()}`);
+    }
+
     static async getUserTasks(filters = {}) {
         try {
             const params = new URLSearchParams();
@@ -504,6 +539,16 @@ class ApiService {
         return this.get('/notifications/');
     }
 
+    // Несколько GET-запросов за один round trip; результат: { id: { status, body } }
+    static async batch(requests) {
+        const response = await this.post('/batch', { requests });
+        const results = {};
+        (response.responses || []).forEach(item => {
+            results[item.id] = item;
+        });
+        return results;
+    }
+
     static async markAllNotificationsRead() {
         return this.put('/notifications/mark_all_read');
     }
@@ -970,14 +1015,19 @@ class App {
 
     static async showCalendar() {
         try {
-            // Получаем задачи пользователя
-            const response = await ApiService.getUserTasks();
+            // Задачи со сроком с начала прошлого месяца до конца следующего
+            const today = new Date();
+            const formatDate = (date) => `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
+            const response = await ApiService.getCalendar(
+                formatDate(new Date(today.getFullYear(), today.getMonth() - 1, 1)),
+                formatDate(new Date(today.getFullYear(), today.getMonth() + 2, 1))
+            );
             const tasks = response.tasks || [];
 
-            // Группируем задачи по датам
+            // Группируем задачи по дням (день считается на сервере в часовом поясе пользователя)
             const tasksByDate = {};
             tasks.forEach(task => {
-                const dateKey = task.due_date ? task.due_date.split('T')[0] : 'без срока';
+                const dateKey = task.day || 'без срока';
                 if (!tasksByDate[dateKey]) {
                     tasksByDate[dateKey] = [];
                 }
@@ -2150,7 +2200,17 @@ static async resetSettings() {
     static async loadData() {
         try {
             console.log('Loading data...');
-            const dashboardData = await ApiService.getDashboard();
+            // Дашборд, задачи, уведомления и команда одним запросом
+            const results = await ApiService.batch([
+                { id: 'dashboard', path: '/dashboard/' },
+                { id: 'tasks', path: '/tasks/' },
+                { id: 'notifications', path: '/notifications/' },
+                { id: 'team', path: '/users/me/team?limit=5' }
+            ]);
+            if (results.dashboard?.status !== 200) {
+                throw new Error(`HTTP ${results.dashboard?.status}: ${JSON.stringify(results.dashboard?.body)}`);
+            }
+            const dashboardData = results.dashboard.body;
             const projects = dashboardData.projects || [];
             const settings = dashboardData.settings || {};
             const recentTasks = dashboardData.recent_tasks || [];
@@ -2160,11 +2220,10 @@ static async resetSettings() {
             this.applyUserSettings(settings);
 
             // Сохраняем все задачи для фильтрации
-            try {
-                const userTasksResponse = await ApiService.getUserTasks();
-                allTasks = userTasksResponse.tasks || [];
-            } catch (taskError) {
-                console.error('Error loading tasks:', taskError);
+            if (results.tasks?.status === 200) {
+                allTasks = results.tasks.body.tasks || [];
+            } else {
+                console.error('Error loading tasks:', results.tasks);
                 allTasks = [];
             }
 
@@ -2174,11 +2233,13 @@ static async resetSettings() {
             this.renderSidebarProjects(projects);
 
             // ЗАГРУЖАЕМ КОМАНДУ ДЛЯ САЙДБАРА
-            await this.loadSidebarTeam(projects);
+            await this.loadSidebarTeam(results.team?.status === 200 ? results.team.body : null);
 
-            // Загружаем уведомления с обработкой ошибок
+            // Уведомления уже получены в batch; при ошибке запрашиваем отдельно
             try {
-                await this.loadNotifications();
+                await this.loadNotifications(
+                    results.notifications?.status === 200 ? results.notifications.body : null
+                );
             } catch (notifError) {
                 console.error('Error loading notifications:', notifError);
             }
@@ -2192,34 +2253,11 @@ static async resetSettings() {
     }
 
     // Новый метод для загрузки команды в сайдбар
-    static async loadSidebarTeam(projects) {
+    static async loadSidebarTeam(preloaded = null) {
         try {
-            const allMembers = new Map();
-
-            // Собираем участников из всех проектов
-            for (const project of projects.slice(0, 5)) { // Ограничиваем 5 проектами
-                const projectData = project.project || project;
-                try {
-                    const membersResponse = await ApiService.getProjectMembers(projectData.hash);
-                    const members = membersResponse.members || [];
-
-                    members.forEach(member => {
-                        const memberData = member.user || member;
-                        const memberId = member.user_id || memberData.id;
-
-                        if (!allMembers.has(memberId)) {
-                            allMembers.set(memberId, {
-                                ...memberData,
-                                role: member.role
-                            });
-                        }
-                    });
-                } catch (error) {
-                    console.error(`Error loading team for project ${projectData.title}:`, error);
-                }
-            }
-
-            this.renderSidebarTeam(Array.from(allMembers.values()));
+            // Участники всех проектов одним запросом; могут прийти уже загруженными в batch
+            const response = preloaded || await ApiService.getMyTeam(5);
+            this.renderSidebarTeam(response.team || []);
         } catch (error) {
             console.error('Error loading sidebar team:', error);
         }
@@ -2434,9 +2472,9 @@ static async resetSettings() {
         }
     }
 
-    static async loadNotifications() {
+    static async loadNotifications(preloaded = null) {
         try {
-            const response = await ApiService.getNotifications();
+            const response = preloaded || await ApiService.getNotifications();
             const notifications = response.notifications || [];
 
             // Обновляем бейдж уведомлений
@@ -2779,12 +2817,41 @@ static async resetSettings() {
             });
 
             // Устанавливаем текущие значения фильтров
+            // Счетчики вариантов - из фасетов сервера
+            if (!taskFacets) {
+                await this.loadFilteredTasks({ facetsOnly: true });
+            }
+            this.applyFacetCounts();
+
             this.setCurrentFilterValues();
         } catch (error) {
             console.error('Error loading filter options:', error);
         }
     }
 
+    // Число задач рядом с каждым вариантом фильтра
+    static applyFacetCounts() {
+        if (!taskFacets) return;
+        const counts = {
+            filterStatus: taskFacets.status || {},
+            filterPriority: taskFacets.priority || {},
+            filterAssignee: {
+                me: currentUser ? (taskFacets.assignee || {})[currentUser.id] : 0,
+                unassigned: (taskFacets.assignee || {}).unassigned
+            }
+        };
+
+        Object.entries(counts).forEach(([selectId, values]) => {
+            const select = document.getElementById(selectId);
+            if (!select) return;
+            Array.from(select.options).forEach(option => {
+                if (!option.value) return;
+                option.dataset.label = option.dataset.label || option.textContent;
+                option.textContent = `${option.dataset.label} (${values[option.value] || 0})`;
+            });
+        });
+    }
+
     static setCurrentFilterValues() {
         document.getElementById('filterStatus').value = currentFilters.status;
         document.getElementById('filterPriority').value = currentFilters.priority;
@@ -2872,28 +2939,90 @@ static async resetSettings() {
         this.applySorting();
     }
 
-    static async applyCurrentFilters() {
-        try {
-            // Получаем задачи в зависимости от текущего view
-            let tasks = [];
-
-            if (currentView === 'myTasksView' || currentView === 'dashboardView') {
-                const response = await ApiService.getUserTasks();
-                tasks = response.tasks || [];
-            } else if (currentView === 'projectView' && currentProject) {
-                const response = await ApiService.getTasks(currentProject.hash);
-                tasks = response.tasks || [];
-            } else if (currentView === 'calendarView') {
-                const response = await ApiService.getUserTasks();
-                tasks = response.tasks || [];
+    // Параметры /tasks/query из текущих фильтров и сортировки
+    static taskQueryParams(extra = {}) {
+        const params = {
+            status: currentFilters.status,
+            priority: currentFilters.priority,
+            projects: currentFilters.project,
+            assignee: currentFilters.assignee,
+            sort: currentSort.field,
+            order: currentSort.direction,
+            limit: 200,
+            include_comments: true,
+            ...extra
+        };
+
+        if (currentFilters.dateRange === 'no_date') {
+            params.has_due_date = false;
+        } else if (currentFilters.dateRange) {
+            const today = new Date();
+            today.setHours(0, 0, 0, 0);
+            const addDays = (days) => {
+                const date = new Date(today);
+                date.setDate(date.getDate() + days);
+                return date.toISOString();
+            };
+
+            switch (currentFilters.dateRange) {
+                case 'today':
+                    params.due_from = addDays(0);
+                    params.due_to = addDays(1);
+                    break;
+                case 'tomorrow':
+                    params.due_from = addDays(1);
+                    params.due_to = addDays(2);
+                    break;
+                case 'week':
+                    params.due_from = addDays(0);
+                    params.due_to = addDays(8);
+                    break;
+                case 'overdue':
+                    params.due_to = addDays(0);
+                    break;
             }
+        }
+        return params;
+    }
 
-            // Применяем фильтры
-            const filteredTasks = this.filterTasks(tasks);
+    // Все страницы /tasks/query по next_cursor; фасеты одинаковы на каждой странице
+    static async queryAllTasks(params) {
+        let response = await ApiService.queryTasks(params);
+        const tasks = [...(response.tasks || [])];
+        taskFacets = response.facets || null;
+        while (response.next_cursor) {
+            response = await ApiService.queryTasks({ ...params, cursor: response.next_cursor });
+            tasks.push(...(response.tasks || []));
+        }
+        return tasks;
+    }
 
-            // Обновляем отображение
-            this.updateTasksDisplay(filteredTasks);
+    // Задачи текущего view с примененными фильтрами и сортировкой;
+    // facetsOnly - одна задача, чтобы получить только фасеты
+    static async loadFilteredTasks({ facetsOnly = false } = {}) {
+        const extra = facetsOnly ? { limit: 1, include_comments: false } : {};
+        if (currentView === 'projectView' && currentProject) {
+            extra.projects = currentProject.hash;
+        }
+        if (facetsOnly) {
+            taskFacets = (await ApiService.queryTasks(this.taskQueryParams(extra))).facets || null;
+            return [];
+        }
+        if (currentView === 'myTasksView' || currentView === 'dashboardView' ||
+            (currentView === 'projectView' && currentProject)) {
+            return this.queryAllTasks(this.taskQueryParams(extra));
+        }
+        if (currentView === 'calendarView') {
+            taskFacets = null;
+            const response = await ApiService.getUserTasks();
+            return this.sortTasks(this.filterTasks(response.tasks || []));
+        }
+        return [];
+    }
 
+    static async applyCurrentFilters() {
+        try {
+            this.updateTasksDisplay(await this.loadFilteredTasks());
         } catch (error) {
             console.error('Error applying filters:', error);
             this.showError('Ошибка применения фильтров: ' + error.message);
@@ -2968,26 +3097,7 @@ static async resetSettings() {
 
     static async applyCurrentSorting() {
         try {
-            // Получаем текущие задачи
-            let tasks = [];
-
-            if (currentView === 'myTasksView' || currentView === 'dashboardView') {
-                const response = await ApiService.getUserTasks();
-                tasks = response.tasks || [];
-            } else if (currentView === 'projectView' && currentProject) {
-                const response = await ApiService.getTasks(currentProject.hash);
-                tasks = response.tasks || [];
-            }
-
-            // Применяем фильтры перед сортировкой
-            const filteredTasks = this.filterTasks(tasks);
-
-            // Сортируем задачи
-            const sortedTasks = this.sortTasks(filteredTasks);
-
-            // Обновляем отображение
-            this.updateTasksDisplay(sortedTasks);
-
+            this.updateTasksDisplay(await this.loadFilteredTasks());
         } catch (error) {
             console.error('Error applying sorting:', error);
             this.showError('Ошибка применения сортировки: ' + error.message);
@@ -3526,16 +3636,14 @@ static async resetSettings() {
 
     static async loadSubtasks(parentTaskId) {
         try {
-            if (!currentProject || !currentProject.hash) {
-                console.error('No current project for loading subtasks');
-                document.getElementById('subtasksList').innerHTML = '<p class="text-center text-gray-500 dark:text-gray-400 py-4">Ошибка загрузки подзадач: проект не выбран</p>';
-                return;
-            }
-
-            // Получаем все задачи проекта
-            const response = await ApiService.getTasks(currentProject.hash);
-            const tasks = response.tasks || [];
-            const subtasks = tasks.filter(task => task.parent_task_id === parentTaskId);
+            // Все дерево подзадач одним запросом; выводим его плоским списком с отступами
+            const response = await ApiService.getTaskTree(parentTaskId);
+            const subtasks = [];
+            const flatten = (node) => node.subtasks.forEach(child => {
+                subtasks.push(child);
+                flatten(child);
+            });
+            flatten(response.task);
             const container = document.getElementById('subtasksList');
 
             if (subtasks.length === 0) {
@@ -3555,13 +3663,14 @@ static async resetSettings() {
             }
 
             container.innerHTML = subtasks.map(subtask => `
-                <div class="flex items-center p-4 rounded-xl bg-gray-50 dark:bg-gray-800/50 hover:bg-white dark:hover:bg-gray-800 transition-colors">
+                <div class="flex items-center p-4 rounded-xl bg-gray-50 dark:bg-gray-800/50 hover:bg-white dark:hover:bg-gray-800 transition-colors" style="margin-left: ${(subtask.depth - 1) * 1.5}rem">
                     <div class="custom-checkbox ${subtask.status === 'done' ? 'checked' : ''} mr-4" onclick="App.toggleSubtaskStatus(${subtask.id}, this)"></div>
                     <div class="flex-1">
                         <div class="font-medium text-gray-900 dark:text-gray-100">${this.escapeHtml(subtask.title)}</div>
                         <div class="flex items-center mt-1 space-x-4 text-sm text-gray-500 dark:text-gray-400">
                             <span class="flex items-center"><span class="priority-indicator priority-${subtask.priority}"></span> ${this.getPriorityText(subtask.priority)}</span>
                             <span><i class="fas fa-calendar-alt mr-1"></i> ${subtask.due_date ? new Date(subtask.due_date).toLocaleDateString() : 'Без срока'}</span>
+                            ${subtask.descendant_count ? `<span><i class="fas fa-sitemap mr-1"></i> ${subtask.done_count}/${subtask.descendant_count} (${subtask.done_percent}%)</span>` : ''}
                         </div>
                     </div>
                 </div>
@@ -3933,10 +4042,16 @@ static async resetSettings() {
     // Обновляем showMyTasks для отображения активных фильтров
     static async showMyTasks() {
         try {
-            const response = await ApiService.getUserTasks();
-            const tasks = response.tasks || [];
-            const filteredTasks = this.filterTasks(tasks);
-            const sortedTasks = this.sortTasks(filteredTasks);
+            // Без фильтров - незавершенные задачи, назначенные на пользователя, с корзинами сроков
+            let sortedTasks;
+            let buckets = null;
+            if (this.hasActiveFilters()) {
+                sortedTasks = await this.loadFilteredTasks();
+            } else {
+                const response = await ApiService.getMyTasks();
+                sortedTasks = response.tasks || [];
+                buckets = response.buckets;
+            }
 
             const myTasksView = document.getElementById('myTasksView');
             if (!myTasksView) {
@@ -3950,6 +4065,11 @@ static async resetSettings() {
                         <div>
                             <h1 class="text-3xl font-black text-gray-900 dark:text-gray-100 mb-2">Мои задачи</h1>
                             <p class="text-gray-600 dark:text-gray-400">Все задачи, назначенные на вас</p>
+                            ${buckets ? `
+                                <p class="text-sm text-gray-500 dark:text-gray-400 mt-1">
+                                    Просрочено: ${buckets.overdue} · Скоро срок: ${buckets.due_soon} · Без срока: ${buckets.no_due_date}
+                                </p>
+                            ` : ''}
                         </div>
                         <div class="mt-4 md:mt-0 flex space-x-3">
                             <button class="btn-premium bg-white dark:bg-gray-800 text-gray-700 dark:text-gray-300 border border-gray-200 dark:border-gray-700 px-4 py-2.5 rounded-xl font-medium flex items-center space-x-2 ${this.hasActiveFilters() ? 'filter-indicator' : ''}"
@@ -4118,6 +4238,7 @@ static async resetSettings() {
                         <span><i class="fas fa-project-diagram mr-1"></i> ${task.project_title || 'Проект'}</span>
                         <span class="flex items-center"><span class="priority-indicator priority-${task.priority}"></span> ${this.getPriorityText(task.priority)}</span>
                         <span><i class="fas fa-calendar-alt mr-1"></i> ${task.due_date ? new Date(task.due_date).toLocaleDateString() : 'Без срока'}</span>
+                        ${task.comment_count ? `<span title="${this.escapeHtml(task.latest_comment ? `${task.latest_comment.author_name}: ${task.latest_comment.snippet}` : '').replace(/"/g, '&quot;')}"><i class="fas fa-comment mr-1"></i> ${task.comment_count}</span>` : ''}
                     </div>
                 </div>
                 <div class="text-right">